@@ -1,26 +1,224 @@
 # app.py
 import streamlit as st
+import openai
 from openai import AzureOpenAI
-import PyPDF2
-import docx
+import httpx
 import io
+import copy
 import json
 import re
 import pandas as pd
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import black, blue
 import base64
 from dotenv import load_dotenv
 import os
+import csv
+import time
+import random
+import hashlib
+import sqlite3
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from collections import Counter
+from functools import lru_cache
 import numpy as np
+from typing import TypedDict, Union, get_type_hints, get_origin, get_args
+from nltk.stem import PorterStemmer
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from text_extraction import pdf_to_text, docx_to_text, iter_resume_files, extract_many
+from rendering import ResumeRenderer, RenderCache, render_resumes_to_zip, RENDER_FORMATS
 
 # Load environment variables
 load_dotenv()
 
+# Local cache directory for AI results (parsed resumes, etc.)
+CACHE_DIR = os.getenv("RESUME_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Bump whenever the ai_parse_resume prompt changes so stale parses are not reused
+PARSE_PROMPT_VERSION = "3"
+
+# Where bulk screening writes its leaderboards
+SCREENING_OUTPUT_DIR = os.getenv("SCREENING_OUTPUT_DIR", "screening_results")
+
+# Columns of the bulk screening leaderboard CSV
+LEADERBOARD_COLUMNS = [
+    'Candidate', 'File', 'ATS Score', 'Keyword Match', 'Skills Alignment',
+    'Experience Match', 'Education Match', 'Matched Keywords', 'Missing Keywords', 'Error'
+]
+
+# Weights of the ATS sub-scores in the overall score (percent)
+ATS_SCORE_WEIGHTS = {
+    'keyword_score': 30,
+    'skills_score': 25,
+    'experience_score': 20,
+    'education_score': 10,
+    'structure_score': 10,
+    'achievement_score': 5
+}
+
+# How much a keyword match counts depending on the resume section it is found in
+SECTION_MATCH_WEIGHTS = {
+    'skills': 1.0,
+    'experience': 1.0,
+    'projects': 0.85,
+    'summary': 0.8,
+    'certifications': 0.8,
+    'achievements': 0.7,
+    'education': 0.6
+}
+
+# Texts per embeddings request
+EMBEDDING_BATCH_SIZE = 64
+
+# Cosine similarity at which a job requirement counts as covered by resume
+# content. Ranges differ by embedding model: 0.8 suits text-embedding-ada-002,
+# while text-embedding-3 models score related text lower (around 0.5)
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("AZURE_OPENAI_EMBEDDINGS_MATCH_THRESHOLD", "0.8"))
+
+# Resume sections the optimizer rewrites; other sections are copied verbatim
+# during incremental re-optimization
+OPTIMIZED_SECTIONS = ('summary', 'skills', 'experience', 'projects', 'achievements')
+
+# Per-task model routing: the deployment tier or name (see AZURE_OPENAI_DEPLOYMENTS),
+# temperature and max_tokens each AI task uses. Simple extraction tasks go to the
+# fast tier and fall back to the strong one when no fast deployment exists.
+# Override per task with MODEL_ROUTES, e.g. '{"calculate_ats_score": {"route": "strong"}}'
+DEFAULT_MODEL_ROUTES = {
+    "parse_resume": {"route": "strong", "temperature": 0.1, "max_tokens": 4000},
+    "extract_job_requirements": {"route": "fast", "temperature": 0.1, "max_tokens": 2000},
+    "optimize_resume": {"route": "strong", "temperature": 0.3, "max_tokens": 4000},
+    "optimize_section": {"route": "strong", "temperature": 0.3, "max_tokens": 1500},
+    "calculate_ats_score": {"route": "fast", "temperature": 0.1, "max_tokens": 1000},
+    "generate_cover_letter": {"route": "strong", "temperature": 0.4, "max_tokens": 1500},
+    "suggest_improvements": {"route": "strong", "temperature": 0.3, "max_tokens": 2000}
+}
+MODEL_ROUTE_OVERRIDES = json.loads(os.getenv("MODEL_ROUTES") or "{}")
+MODEL_ROUTES = {
+    task: {**route, **MODEL_ROUTE_OVERRIDES.get(task, {})}
+    for task, route in DEFAULT_MODEL_ROUTES.items()
+}
+
+# How resume/requirements JSON is embedded in prompts: "compact" (pruned,
+# minified) or "pretty" (indented, every field) for comparison
+PROMPT_FORMAT = os.getenv("PROMPT_FORMAT", "compact")
+
+# Resumes longer than this many input tokens are parsed in chunks, keeping
+# each chunk's JSON output well inside the parse call's max_tokens
+PARSE_CHUNK_TOKENS = int(os.getenv("PARSE_CHUNK_TOKENS", "3000"))
+
+# Lines that start a new resume section, used to split long resumes
+RESUME_SECTION_HEADING = re.compile(
+    r'^[ \t]*(?:[A-Za-z&/]+[ \t]+){0,2}'
+    r'(?:summary|objective|profile|experience|employment|work history|education|skills|competencies|'
+    r'projects|publications|certifications?|licenses|awards|honou?rs|achievements|languages|research|'
+    r'teaching|presentations|grants|patents|volunteer(?:ing)?|interests|references)\b[^\n]{0,30}$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Typed schemas of the structured AI responses. They are defined once and
+# turned into the API response_format (or a compact prompt skeleton for
+# older API versions) and into the local response validator.
+class PersonalInfo(TypedDict):
+    name: str
+    email: str
+    phone: str
+    location: str
+    linkedin: str
+    website: str
+    github: str
+
+class ExperienceEntry(TypedDict):
+    title: str
+    company: str
+    location: str
+    duration: str
+    description: Union[list[str], str]
+
+class Skills(TypedDict):
+    technical: list[str]
+    programming: list[str]
+    tools: list[str]
+    soft_skills: list[str]
+
+class EducationEntry(TypedDict):
+    degree: str
+    school: str
+    location: str
+    year: str
+    gpa: str
+    honors: str
+
+class ProjectEntry(TypedDict):
+    name: str
+    description: Union[str, list[str]]
+    technologies: list[str]
+    duration: str
+    url: str
+
+class CertificationEntry(TypedDict):
+    name: str
+    issuer: str
+    date: str
+    expiry: str
+
+class LanguageEntry(TypedDict):
+    language: str
+    proficiency: str
+
+class ResumeData(TypedDict):
+    personal_info: PersonalInfo
+    summary: str
+    experience: list[ExperienceEntry]
+    skills: Skills
+    education: list[EducationEntry]
+    projects: list[ProjectEntry]
+    certifications: list[CertificationEntry]
+    languages: list[LanguageEntry]
+    achievements: list[str]
+
+class JobRequirements(TypedDict):
+    required_skills: list[str]
+    preferred_skills: list[str]
+    experience_level: str
+    education_requirements: list[str]
+    key_responsibilities: list[str]
+    industry: str
+    job_type: str
+    keywords: list[str]
+    company_culture: list[str]
+    must_have_technologies: list[str]
+    nice_to_have_technologies: list[str]
+
+class ATSInsights(TypedDict):
+    experience_score: int
+    education_score: int
+    strengths: list[str]
+    improvements: list[str]
+    ats_recommendations: list[str]
+
+class Suggestions(TypedDict):
+    content_improvements: list[str]
+    keyword_optimization: list[str]
+    formatting_enhancements: list[str]
+    skills_development: list[str]
+    experience_enhancement: list[str]
+    quick_wins: list[str]
+    long_term_goals: list[str]
+
+# Same for the ai_extract_job_requirements prompt
+JOB_REQUIREMENTS_PROMPT_VERSION = "2"
+
+# Boilerplate that varies between postings of the same job and is ignored
+# when deciding whether two job descriptions are the same
+JOB_BOILERPLATE_PATTERNS = [
+    r'[^.]*\bequal opportunity employer\b[^.]*\.?',
+    r'[^.]*\bwithout regard to\b[^.]*\.?',
+    r'[^.]*\breasonable accommodations?\b[^.]*\.?',
+    r'\b(?:apply now|apply today|click apply|easy apply)\b',
+    r'\bjob (?:id|ref(?:erence)?|requisition)\s*[:#]?\s*[\w-]+',
+    r'\bposted\s+\d+\s+\w+\s+ago\b',
+]
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Nagashree's ATS Resume Builder",
@@ -124,10 +322,1196 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class AIResumeOptimizer:
+class DiskCache:
+    """Persistent key/value cache backed by SQLite with LRU eviction.
+
+    Values are stored as JSON and optionally expire `ttl` seconds after they
+    were written. The database file can be shared by several Streamlit
+    sessions and processes; SQLite takes care of the locking.
+    """
+
+    def __init__(self, path, max_entries=500, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    @staticmethod
+    def make_key(*parts):
+        """Content-address a tuple of strings with SHA-256"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        try:
+            with self.lock, self.conn:
+                row = self.conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if self.ttl is not None and now - row[1] > self.ttl:
+                    self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    return None
+                self.conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def set(self, key, value):
+        """Store value under key and evict the least recently used entries"""
+        now = time.time()
+        try:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                if self.ttl is not None:
+                    self.conn.execute("DELETE FROM cache WHERE created < ?", (now - self.ttl,))
+                self.conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except sqlite3.Error:
+            pass
+
+class JSONSectionScanner:
+    """Incrementally scan a streamed JSON object.
+
+    Text is fed chunk by chunk as it arrives from the model; every top-level
+    member ("summary": ..., "experience": [...]) is returned as soon as its
+    value is complete. Anything before the opening brace (markdown fences,
+    prose) and after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self.member = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the (key, value) members it completed"""
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if self.in_string:
+                self.member.append(char)
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.finished = True
+                    completed.extend(self._finish_member())
+                    continue
+            elif char == ',' and self.depth == 1:
+                completed.extend(self._finish_member())
+                continue
+            self.member.append(char)
+        return completed
+
+    def _finish_member(self):
+        text = ''.join(self.member).strip()
+        self.member = []
+        if not text:
+            return []
+        try:
+            return list(json.loads('{' + text + '}').items())
+        except ValueError:
+            return []
+
+def iter_stream_text(response, finish_reasons=None):
+    """Yield the text deltas of a streaming chat completion.
+
+    The finish reason of the final chunk is appended to finish_reasons when
+    a list is given.
+    """
+    for chunk in response:
+        # Azure sends content-filter chunks without choices
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if finish_reasons is not None and getattr(choice, 'finish_reason', None):
+            finish_reasons.append(choice.finish_reason)
+        if choice.delta.content:
+            yield choice.delta.content
+
+def strip_trailing_commas(text):
+    """Remove commas directly before a closing bracket, outside strings"""
+    output = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '}]':
+            while output and output[-1].isspace():
+                output.pop()
+            if output and output[-1] == ',':
+                output.pop()
+        output.append(char)
+    return ''.join(output)
+
+def extract_json_object(text, expected_keys=None):
+    """Return the first balanced JSON object in a model response.
+
+    Markdown fences, leading prose and trailing commentary are skipped, and
+    trailing commas are tolerated. If the text ends inside the object (the
+    completion hit max_tokens) the open structures are closed by
+    repair_truncated_json. With `expected_keys`, objects holding none of
+    them (a stray nested object, an example in prose) are passed over.
+    """
+    def acceptable(data):
+        return isinstance(data, dict) and (not expected_keys or any(key in data for key in expected_keys))
+
+    start = text.find('{')
+    while start != -1:
+        next_start = start + 1
+        depth = 0
+        in_string = escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    candidate = text[start:index + 1]
+                    for attempt in (candidate, strip_trailing_commas(candidate)):
+                        try:
+                            data = json.loads(attempt)
+                        except ValueError:
+                            continue
+                        if acceptable(data):
+                            return data
+                        break
+                    # Never resume inside the rejected object: its nested
+                    # objects are fragments, not the response
+                    next_start = index + 1
+                    break
+        else:
+            try:
+                data = repair_truncated_json(text[start:])
+            except ValueError:
+                data = None
+            if acceptable(data):
+                return data
+            break
+        start = text.find('{', next_start)
+    raise ValueError("No JSON object found in model response")
+
+def close_json_fragment(fragment):
+    """Close the open string, arrays and objects at the end of a JSON fragment"""
+    closers = []
+    in_string = escaped = False
+    for char in fragment:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]' and closers:
+            closers.pop()
+    if in_string:
+        fragment += '"'
+    fragment = fragment.rstrip().rstrip(',:').rstrip()
+    return fragment + ''.join(reversed(closers))
+
+def repair_truncated_json(fragment, max_attempts=50):
+    """Recover as much as possible of a truncated JSON object.
+
+    Closes the open structures; when the last member is incomplete (e.g. a
+    key without a value) it is dropped by cutting back to the previous comma.
+    """
+    candidate = fragment
+    for _ in range(max_attempts):
+        try:
+            return json.loads(strip_trailing_commas(close_json_fragment(candidate)))
+        except ValueError:
+            cut = candidate.rfind(',')
+            if cut == -1:
+                break
+            candidate = candidate[:cut]
+    raise ValueError("Could not recover truncated JSON from model response")
+
+def is_typed_dict(tp):
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, '__annotations__')
+
+@lru_cache(maxsize=None)
+def typed_dict_fields(tp):
+    return get_type_hints(tp)
+
+def coerce_to_type(value, tp):
+    """Return value coerced to the annotated type, or raise ValueError"""
+    origin = get_origin(tp)
+    if origin is Union:
+        for option in get_args(tp):
+            try:
+                return coerce_to_type(value, option)
+            except ValueError:
+                continue
+        raise ValueError(f"{value!r} matches none of {tp}")
+    if origin is list:
+        if not isinstance(value, list):
+            raise ValueError(f"expected a list, got {type(value).__name__}")
+        (item_type,) = get_args(tp)
+        items = []
+        for item in value:
+            try:
+                items.append(coerce_to_type(item, item_type))
+            except ValueError:
+                continue
+        return items
+    if is_typed_dict(tp):
+        if not isinstance(value, dict):
+            raise ValueError(f"expected an object, got {type(value).__name__}")
+        return validate_json_schema(value, tp)
+    if tp is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    elif tp is int:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return round(value)
+        if isinstance(value, str) and re.fullmatch(r'\s*\d+(\.\d+)?\s*%?\s*', value):
+            return round(float(value.strip().rstrip('%')))
+    raise ValueError(f"expected {getattr(tp, '__name__', tp)}, got {type(value).__name__}")
+
+def validate_json_schema(data, schema):
+    """Validate an AI response against its TypedDict schema.
+
+    Values are coerced where that is unambiguous (numbers to strings, "85%"
+    to 85); fields and list items that still do not fit, and null fields
+    (strict schemas make every field nullable), are dropped so the callers
+    fall back to their defaults. Unknown keys are kept.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Model response is not a JSON object")
+    for key, expected_type in typed_dict_fields(schema).items():
+        if key not in data:
+            continue
+        value = data[key]
+        if value is None:
+            del data[key]
+            continue
+        try:
+            data[key] = coerce_to_type(value, expected_type)
+        except ValueError:
+            del data[key]
+    return data
+
+def json_schema_for(tp):
+    """Strict JSON Schema for a TypedDict (every field required but nullable)"""
+    if get_origin(tp) is Union:
+        return {"anyOf": [json_schema_for(option) for option in get_args(tp)]}
+    if get_origin(tp) is list:
+        return {"type": "array", "items": json_schema_for(get_args(tp)[0])}
+    if is_typed_dict(tp):
+        fields = typed_dict_fields(tp)
+        return {
+            "type": "object",
+            "properties": {
+                key: {"anyOf": [json_schema_for(field_type), {"type": "null"}]}
+                for key, field_type in fields.items()
+            },
+            "required": list(fields),
+            "additionalProperties": False
+        }
+    return {"type": "integer" if tp is int else "string"}
+
+def schema_skeleton(tp):
+    """Compact example structure of a TypedDict for prompts without structured output"""
+    if get_origin(tp) is Union:
+        return schema_skeleton(get_args(tp)[0])
+    if get_origin(tp) is list:
+        return [schema_skeleton(get_args(tp)[0])]
+    if is_typed_dict(tp):
+        return {key: schema_skeleton(field_type) for key, field_type in typed_dict_fields(tp).items()}
+    return 0 if tp is int else ""
+
+def decode_json_response(content, schema=None):
+    """Decode the JSON object of a model response, validating it against schema"""
+    data = extract_json_object(content or "", typed_dict_fields(schema) if schema is not None else None)
+    if schema is not None:
+        data = validate_json_schema(data, schema)
+    return data
+
+class FallbackResume(dict):
+    """Resume returned when parsing or optimization failed wholly or in part,
+    so some sections are placeholder or original, unoptimized content"""
+    
+    def __init__(self, resume_data=(), error=""):
+        super().__init__(resume_data)
+        self.error = error
+
+class AIPipeline:
+    """Dependency-aware scheduler for AI calls.
+
+    Every step names the steps it depends on and starts as soon as their
+    results are available, so independent calls (e.g. resume parsing and job
+    requirement extraction) run concurrently on a thread pool.
+    """
+
+    def __init__(self, max_workers=4):
+        # Attach the current Streamlit script context to worker threads so
+        # st.error and friends still render from inside pipeline steps
+        ctx = get_script_run_ctx()
+
+        def attach_context():
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ai-pipeline",
+            initializer=attach_context
+        )
+        self.steps = {}
+
+    def add(self, name, func, *args, depends_on=(), **kwargs):
+        """Schedule func(*dependency_results, *args, **kwargs) as step `name`"""
+        # Dependencies are always submitted before their dependents, so the
+        # FIFO work queue can never deadlock on a blocked worker
+        dependencies = [self.steps[dep] for dep in depends_on]
+
+        def run():
+            results = [dependency.result() for dependency in dependencies]
+            return func(*results, *args, **kwargs)
+
+        self.steps[name] = self.executor.submit(run)
+        return self.steps[name]
+
+    def add_result(self, name, value):
+        """Register an already known value as a completed step"""
+        future = Future()
+        future.set_result(value)
+        self.steps[name] = future
+        return future
+
+    def result(self, name):
+        """Block until step `name` finishes and return its result"""
+        return self.steps[name].result()
+
+    def as_completed(self, names):
+        """Yield (name, result) for the given steps in completion order"""
+        futures = {self.steps[name]: name for name in names}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def __contains__(self, name):
+        return name in self.steps
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+class LocalATSScorer:
+    """Deterministic ATS scoring from parsed resume and job requirements JSON.
+
+    Keyword sets are normalized and stemmed once per job, so scoring a resume
+    takes milliseconds and always gives the same result for the same input.
+    Computes keyword_score, skills_score, structure_score, achievement_score,
+    matched_keywords and missing_keywords; the qualitative fields are left
+    to ai_calculate_ats_score.
+    """
+
+    stemmer = PorterStemmer()
+
+    def __init__(self, job_requirements):
+        job_requirements = job_requirements or {}
+        required = self._as_list(job_requirements.get('required_skills')) + \
+            self._as_list(job_requirements.get('must_have_technologies'))
+        preferred = self._as_list(job_requirements.get('preferred_skills')) + \
+            self._as_list(job_requirements.get('nice_to_have_technologies'))
+        keywords = self._as_list(job_requirements.get('keywords')) + required
+
+        self.keywords = self._compile(keywords)
+        self.required_skills = self._compile(required)
+        # A skill listed as both required and preferred only counts as required
+        self.preferred_skills = [
+            (term, phrase) for term, phrase in self._compile(preferred)
+            if phrase not in {p for _, p in self.required_skills}
+        ]
+
+    @staticmethod
+    def _as_list(value):
+        if isinstance(value, list):
+            return [str(item) for item in value if item]
+        if isinstance(value, str) and value:
+            return [value]
+        return []
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _stem(cls, token):
+        return cls.stemmer.stem(token)
+
+    @classmethod
+    def normalize(cls, text):
+        """Lowercase, tokenize and stem text into a space padded phrase"""
+        tokens = re.findall(r'[a-z0-9][a-z0-9+#.]*', str(text).lower())
+        return ' ' + ' '.join(cls._stem(token.rstrip('.')) for token in tokens) + ' '
+
+    @classmethod
+    def _compile(cls, terms):
+        """Normalize terms once, dropping duplicates but keeping the original spelling"""
+        compiled = []
+        seen = set()
+        for term in terms:
+            phrase = cls.normalize(term)
+            if phrase.strip() and phrase not in seen:
+                seen.add(phrase)
+                compiled.append((term.strip(), phrase))
+        return compiled
+
+    @staticmethod
+    def _flatten(value):
+        if isinstance(value, dict):
+            return [text for item in value.values() for text in LocalATSScorer._flatten(item)]
+        if isinstance(value, list):
+            return [text for item in value for text in LocalATSScorer._flatten(item)]
+        return [str(value)] if value else []
+
+    def _sections(self, resume_data):
+        """Normalized text of each resume section that keywords are matched against"""
+        return {
+            section: self.normalize(' '.join(self._flatten(resume_data.get(section))))
+            for section in SECTION_MATCH_WEIGHTS
+        }
+
+    @staticmethod
+    def _best_weight(phrase, sections):
+        return max(
+            (SECTION_MATCH_WEIGHTS[section] for section, text in sections.items() if phrase in text),
+            default=0.0
+        )
+
+    def keyword_analysis(self, sections):
+        matched, missing = [], []
+        total = 0.0
+        for term, phrase in self.keywords:
+            weight = self._best_weight(phrase, sections)
+            total += weight
+            (matched if weight else missing).append(term)
+        score = 100 * total / len(self.keywords) if self.keywords else 0
+        return score, matched, missing
+
+    def skills_score(self, sections):
+        # Required skills count double; a skill found outside the skills
+        # section (e.g. only in a bullet) gets partial credit
+        weighted = [(term, phrase, 2.0) for term, phrase in self.required_skills] + \
+            [(term, phrase, 1.0) for term, phrase in self.preferred_skills]
+        if not weighted:
+            return 0
+        earned = 0.0
+        for _, phrase, weight in weighted:
+            if phrase in sections['skills']:
+                earned += weight
+            elif self._best_weight(phrase, sections):
+                earned += 0.75 * weight
+        return 100 * earned / sum(weight for _, _, weight in weighted)
+
+    @staticmethod
+    def structure_score(resume_data):
+        personal_info = resume_data.get('personal_info') or {}
+        experience = resume_data.get('experience') or []
+        checks = [
+            personal_info.get('name'),
+            personal_info.get('email'),
+            personal_info.get('phone'),
+            resume_data.get('summary'),
+            experience,
+            experience and all(isinstance(exp, dict) and exp.get('description') for exp in experience),
+            resume_data.get('skills'),
+            resume_data.get('education')
+        ]
+        return 100 * sum(1 for check in checks if check) / len(checks)
+
+    @staticmethod
+    def achievement_score(resume_data):
+        """Share of experience and project bullets that quantify their impact"""
+        bullets = []
+        for entry in (resume_data.get('experience') or []) + (resume_data.get('projects') or []):
+            if isinstance(entry, dict):
+                bullets.extend(LocalATSScorer._flatten(entry.get('description')))
+        if not bullets:
+            return 0
+        quantified = sum(1 for bullet in bullets if re.search(r'\d|%|\$', bullet))
+        return 100 * quantified / len(bullets)
+
+    def score(self, resume_data):
+        resume_data = resume_data or {}
+        sections = self._sections(resume_data)
+        keyword_score, matched, missing = self.keyword_analysis(sections)
+        return {
+            'keyword_score': round(keyword_score),
+            'skills_score': round(self.skills_score(sections)),
+            'structure_score': round(self.structure_score(resume_data)),
+            'achievement_score': round(self.achievement_score(resume_data)),
+            'matched_keywords': matched,
+            'missing_keywords': missing
+        }
+
+@lru_cache(maxsize=32)
+def get_local_scorer(job_requirements_json):
+    """Build (once per job) the scorer for JSON-serialized job requirements"""
+    return LocalATSScorer(json.loads(job_requirements_json))
+
+def overall_ats_score(analysis):
+    """Weighted overall score from whichever sub-scores are present"""
+    available = {key: weight for key, weight in ATS_SCORE_WEIGHTS.items() if key in analysis}
+    if not available:
+        return 0
+    total = sum(analysis[key] * weight for key, weight in available.items())
+    return round(total / sum(available.values()))
+
+class SemanticMatcher:
+    """Embedding-based matching of resume content against job requirements.
+
+    Texts are embedded in batched calls to the embeddings deployment and the
+    vectors are cached on disk by content hash, so each bullet or skill is
+    embedded once. Similarities are plain NumPy matrix products of unit
+    vectors, which makes scoring against many jobs a single multiply.
+    """
+
+    def __init__(self, azure_client, deployment, cache, scheduler, threshold=SEMANTIC_MATCH_THRESHOLD):
+        self.azure_client = azure_client
+        self.deployment = deployment
+        self.cache = cache
+        self.scheduler = scheduler
+        self.threshold = threshold
+
+    def embed(self, texts):
+        """Return a (len(texts), dim) matrix of unit-length embeddings"""
+        keys = [DiskCache.make_key(self.deployment, text) for text in texts]
+        vectors = {}
+        missing = []
+        for text, key in zip(texts, keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[key] = np.frombuffer(base64.b64decode(cached), dtype=np.float32)
+            elif key not in vectors:
+                vectors[key] = None
+                missing.append((text, key))
+
+        for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+            batch = missing[start:start + EMBEDDING_BATCH_SIZE]
+            response = self.scheduler.call(
+                self.azure_client.embeddings.create,
+                sum(estimate_tokens(text) for text, _ in batch),
+                model=self.deployment,
+                input=[text for text, _ in batch]
+            )
+            for (_, key), item in zip(batch, response.data):
+                vector = np.asarray(item.embedding, dtype=np.float32)
+                vector /= np.linalg.norm(vector) or 1.0
+                vectors[key] = vector
+                self.cache.set(key, base64.b64encode(vector.tobytes()).decode('ascii'))
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys])
+
+    def similarity_matrix(self, texts_a, texts_b):
+        """Cosine similarity of every text in texts_a against every text in texts_b"""
+        if not texts_a or not texts_b:
+            return np.zeros((len(texts_a), len(texts_b)), dtype=np.float32)
+        return self.embed(texts_a) @ self.embed(texts_b).T
+
+    @staticmethod
+    def resume_items(resume_data):
+        """Resume bullets, skills and summary as individual texts"""
+        items = []
+        if resume_data.get('summary'):
+            items.extend(sentence.strip() for sentence in re.split(r'(?<=[.!?])\s+', resume_data['summary']) if sentence.strip())
+        skills = resume_data.get('skills') or {}
+        skill_lists = skills.values() if isinstance(skills, dict) else [skills]
+        for skill_list in skill_lists:
+            if isinstance(skill_list, list):
+                items.extend(str(skill) for skill in skill_list if skill)
+        for section in ('experience', 'projects'):
+            for entry in resume_data.get(section) or []:
+                if not isinstance(entry, dict):
+                    continue
+                description = entry.get('description')
+                bullets = description if isinstance(description, list) else [description]
+                items.extend(str(bullet) for bullet in bullets if bullet)
+        # Keep order but embed each distinct text once
+        return list(dict.fromkeys(items))
+
+    @staticmethod
+    def requirement_items(job_requirements):
+        """Skills, technologies and responsibilities the job asks for"""
+        items = []
+        for key in ('required_skills', 'must_have_technologies', 'preferred_skills',
+                    'nice_to_have_technologies', 'key_responsibilities'):
+            value = job_requirements.get(key) or []
+            items.extend(str(item) for item in (value if isinstance(value, list) else [value]) if item)
+        return list(dict.fromkeys(items))
+
+    def match(self, resume_data, job_requirements, threshold=None):
+        """Align each job requirement with its closest resume item"""
+        threshold = self.threshold if threshold is None else threshold
+        resume_items = self.resume_items(resume_data)
+        requirement_items = self.requirement_items(job_requirements)
+        similarities = self.similarity_matrix(requirement_items, resume_items)
+
+        alignment = []
+        for row, requirement in enumerate(requirement_items):
+            if resume_items:
+                best = int(np.argmax(similarities[row]))
+                alignment.append({
+                    'requirement': requirement,
+                    'best_match': resume_items[best],
+                    'similarity': round(float(similarities[row, best]), 3)
+                })
+            else:
+                alignment.append({'requirement': requirement, 'best_match': '', 'similarity': 0.0})
+
+        covered = sum(1 for item in alignment if item['similarity'] >= threshold)
+        return {
+            'semantic_score': round(100 * covered / len(alignment)) if alignment else 0,
+            'alignment': alignment
+        }
+
+    def rank_jobs(self, resume_data, job_requirements_list, threshold=None):
+        """Semantic score of one resume against many jobs with a single matrix multiply"""
+        threshold = self.threshold if threshold is None else threshold
+        resume_items = self.resume_items(resume_data)
+        per_job = [self.requirement_items(requirements) for requirements in job_requirements_list]
+        all_requirements = [item for items in per_job for item in items]
+        if not resume_items or not all_requirements:
+            return [0] * len(job_requirements_list)
+
+        best = (self.similarity_matrix(all_requirements, resume_items) >= threshold).any(axis=1)
+        scores = []
+        start = 0
+        for items in per_job:
+            covered = best[start:start + len(items)]
+            scores.append(round(100 * float(covered.mean())) if len(items) else 0)
+            start += len(items)
+        return scores
+
+def prune_empty(value):
+    """Drop None, empty strings and empty containers from nested JSON data"""
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune_empty(item) for item in value]
+        return [item for item in pruned if item not in (None, "", [], {})]
+    return value
+
+def encode_for_prompt(data, prompt_format=None):
+    """Serialize JSON data for a prompt in the configured PROMPT_FORMAT"""
+    if (prompt_format or PROMPT_FORMAT) == "pretty":
+        return json.dumps(data, indent=2)
+    return json.dumps(prune_empty(data), separators=(',', ':'), ensure_ascii=False)
+
+@lru_cache(maxsize=1)
+def get_token_encoding():
+    """tiktoken's cl100k_base encoding, or None when tiktoken is missing or
+    its encoding file cannot be loaded (e.g. offline)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def estimate_tokens(text):
+    """Count prompt tokens with tiktoken (a requirement), falling back to
+    ~4 characters per token when its encoding is unavailable"""
+    encoding = get_token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+def split_resume_text(text, max_tokens):
+    """Split resume text into chunks of at most max_tokens, breaking at section headings.
+
+    Consecutive sections are packed into the same chunk while they fit; a
+    single section that is too long is split between lines.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    starts = [0] + [match.start() for match in RESUME_SECTION_HEADING.finditer(text) if match.start() > 0]
+    sections = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    pieces = []
+    for section in sections:
+        if estimate_tokens(section) <= max_tokens:
+            pieces.append(section)
+            continue
+        piece = ""
+        for line in section.splitlines(keepends=True):
+            if piece and estimate_tokens(piece + line) > max_tokens:
+                pieces.append(piece)
+                piece = ""
+            piece += line
+        if piece:
+            pieces.append(piece)
+
+    chunks = []
+    chunk = ""
+    for piece in pieces:
+        if chunk and estimate_tokens(chunk + piece) > max_tokens:
+            chunks.append(chunk)
+            chunk = ""
+        chunk += piece
+    if chunk.strip():
+        chunks.append(chunk)
+    return chunks
+
+def merge_parsed_resumes(parts):
+    """Deterministically merge partial resume JSON parsed from consecutive chunks.
+
+    Scalars keep the first non-empty value, lists are concatenated in chunk
+    order without duplicates and dicts (personal_info, skills) merge per key.
+    """
+    merged = {}
+    for part in parts:
+        for key, value in (part or {}).items():
+            if value in (None, "", [], {}):
+                continue
+            current = merged.get(key)
+            if current in (None, "", [], {}):
+                merged[key] = copy.deepcopy(value)
+            elif isinstance(current, list) and isinstance(value, list):
+                for item in value:
+                    if item not in current:
+                        current.append(copy.deepcopy(item))
+            elif isinstance(current, dict) and isinstance(value, dict):
+                merged[key] = merge_parsed_resumes([current, value])
+    return merged
+
+class UsageTracker:
+    """Thread-safe per-call record of prompt size, token usage and latency"""
+
+    def __init__(self, max_records=500):
+        self.records = []
+        self.max_records = max_records
+        self.lock = threading.Lock()
+
+    def record(self, task, estimated_prompt_tokens, usage, latency,
+               deployment=None, temperature=None, max_tokens=None, finish_reason=None):
+        entry = {
+            'Time': pd.Timestamp.now().strftime('%H:%M:%S'),
+            'Task': task,
+            'Deployment': deployment,
+            'Temperature': temperature,
+            'Max Tokens': max_tokens,
+            'Format': PROMPT_FORMAT,
+            'Est. Prompt Tokens': estimated_prompt_tokens,
+            'Prompt Tokens': getattr(usage, 'prompt_tokens', None),
+            'Completion Tokens': getattr(usage, 'completion_tokens', None),
+            'Finish': finish_reason,
+            'Latency (s)': round(latency, 2)
+        }
+        with self.lock:
+            self.records.append(entry)
+            del self.records[:-self.max_records]
+
+    def to_dataframe(self):
+        with self.lock:
+            return pd.DataFrame(list(self.records))
+
+    def route_summary(self):
+        """Latency and quality per task and deployment, for tuning MODEL_ROUTES.
+
+        Truncated calls hit max_tokens (finish reason "length"); a high rate
+        means the route's budget is too small for that task.
+        """
+        records = self.to_dataframe()
+        if records.empty:
+            return records
+        records['Truncated'] = records['Finish'] == 'length'
+        return records.groupby(['Task', 'Deployment'], dropna=False).agg(
+            Calls=('Latency (s)', 'size'),
+            **{
+                'Median latency (s)': ('Latency (s)', 'median'),
+                'P95 latency (s)': ('Latency (s)', lambda latency: latency.quantile(0.95)),
+                'Avg completion tokens': ('Completion Tokens', 'mean'),
+                'Truncated %': ('Truncated', lambda truncated: round(100 * truncated.mean(), 1))
+            }
+        ).reset_index()
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` units per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Block until `amount` units are available and take them"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+class CircuitOpenError(Exception):
+    """Raised without calling Azure while the circuit breaker is open"""
+
+class RequestScheduler:
+    """Central gate for every Azure OpenAI request.
+
+    Requests wait for both a requests-per-minute and a tokens-per-minute
+    bucket, get a per-call timeout and are retried with jittered
+    exponential backoff on 429s, timeouts, connection errors and 5xx
+    responses. A Retry-After header pauses all callers for that long.
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds, then a trial call is let
+    through to probe recovery.
+    """
+
+    RETRYABLE_ERRORS = (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError
+    )
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, timeout=60.0,
+                 max_retries=5, base_delay=1.0, max_delay=60.0, failure_threshold=5, reset_timeout=30.0):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.paused_until = 0.0
+
+    @classmethod
+    def from_env(cls, requests_per_minute=None, tokens_per_minute=None, max_retries=None):
+        """Build a scheduler from AZURE_OPENAI_* settings; arguments override them"""
+        def optional_int(name):
+            value = os.getenv(name)
+            return int(value) if value else None
+        return cls(
+            requests_per_minute=requests_per_minute or optional_int("AZURE_OPENAI_RPM"),
+            tokens_per_minute=tokens_per_minute or optional_int("AZURE_OPENAI_TPM"),
+            timeout=float(os.getenv("AZURE_OPENAI_REQUEST_TIMEOUT", "60")),
+            max_retries=max_retries if max_retries is not None else int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "5"))
+        )
+
+    def available(self):
+        """False while the circuit is open and calls would fail fast"""
+        with self.lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= self.reset_timeout
+
+    @staticmethod
+    def retry_after(error):
+        """Seconds the service asked us to wait, if it said so"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000
+            if headers.get('retry-after'):
+                return float(headers['retry-after'])
+        except ValueError:
+            return None
+        return None
+
+    def _check_circuit(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Azure OpenAI is unavailable, retrying shortly")
+            # Half-open: let this call through as a probe
+            self.opened_at = None
+            self.consecutive_failures = self.failure_threshold - 1
+
+    def _record(self, success):
+        with self.lock:
+            if success:
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def call(self, func, estimated_tokens=0, **kwargs):
+        """Call func(**kwargs, timeout=...) under rate limits, retries and the circuit breaker"""
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            if self.request_bucket:
+                self.request_bucket.acquire(1)
+            if self.token_bucket:
+                self.token_bucket.acquire(estimated_tokens)
+
+            try:
+                result = func(timeout=self.timeout, **kwargs)
+            except self.RETRYABLE_ERRORS as e:
+                # 429s are back-pressure, not an outage
+                if not isinstance(e, openai.RateLimitError):
+                    self._record(False)
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_after(e)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                else:
+                    with self.lock:
+                        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                time.sleep(delay)
+            else:
+                self._record(True)
+                return result
+
+class ChatDeployment:
+    """One Azure OpenAI chat deployment with its own quota and health stats"""
+
+    def __init__(self, name, client, deployment, tier, scheduler, api_version=None):
+        self.name = name
+        self.client = client
+        self.deployment = deployment
+        self.tier = tier
+        self.scheduler = scheduler
+        self.api_version = api_version
+        self.in_flight = 0
+        self.latency = None
+        self.calls = 0
+        self.failures = 0
+
+    def expected_wait(self):
+        """Smoothed latency scaled by queued work; unmeasured deployments go first"""
+        return (self.latency or 0.0) * (self.in_flight + 1)
+
+class DeploymentPool:
+    """Routes chat completions across several Azure OpenAI deployments.
+
+    Each call goes to the healthy deployment of the requested route (a tier
+    or deployment name) with the
+    fewest recent failures and lowest expected wait, then fails over to the others (other tiers last)
+    on retryable errors or an open circuit. Configure with
+    AZURE_OPENAI_DEPLOYMENTS, a JSON list such as
+    [{"name": "east", "endpoint": "https://...", "deployment": "gpt-4o",
+      "tier": "strong", "rpm": 300, "tpm": 150000}, ...];
+    api_key and api_version default to the single-endpoint settings, and
+    the endpoint may be a local mock server.
+    """
+
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(self, deployments):
+        self.deployments = deployments
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, http_client, api_key, api_version):
+        configs = json.loads(os.getenv("AZURE_OPENAI_DEPLOYMENTS") or "[]") or [{
+            "name": "default",
+            "endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
+            "deployment": os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+        }]
+        # With somewhere to fail over to, retry less on each deployment
+        default_retries = 1 if len(configs) > 1 else None
+        deployments = []
+        for config in configs:
+            client = AzureOpenAI(
+                azure_endpoint=config["endpoint"],
+                api_key=config.get("api_key", api_key),
+                api_version=config.get("api_version", api_version),
+                http_client=http_client,
+                max_retries=0
+            )
+            scheduler = RequestScheduler.from_env(
+                requests_per_minute=config.get("rpm"),
+                tokens_per_minute=config.get("tpm"),
+                max_retries=config.get("max_retries", default_retries)
+            )
+            deployments.append(ChatDeployment(
+                config.get("name", config["deployment"]), client, config["deployment"],
+                config.get("tier", "strong"), scheduler,
+                api_version=config.get("api_version", api_version)
+            ))
+        return cls(deployments)
+
+    @property
+    def primary(self):
+        return self.deployments[0]
+
+    def route_models(self, route):
+        """Sorted model deployments that can serve `route` first (all of them
+        when none matches, as candidates() then falls back to any)"""
+        matching = [d for d in self.deployments if route in (d.tier, d.name)] or self.deployments
+        return sorted({d.deployment for d in matching})
+
+    @property
+    def oldest_api_version(self):
+        """The lowest api_version in the pool; any deployment may serve any call"""
+        return min(d.api_version or "" for d in self.deployments)
+
+    def candidates(self, route=None):
+        """Deployments in the order to try them; `route` is a tier or deployment name"""
+        with self.lock:
+            return sorted(
+                self.deployments,
+                key=lambda d: (
+                    not d.scheduler.available(),
+                    route is not None and route not in (d.tier, d.name),
+                    d.scheduler.consecutive_failures,
+                    d.expected_wait()
+                )
+            )
+
+    def chat_completion(self, estimated_tokens, route=None, **kwargs):
+        """Create a chat completion on the best deployment, failing over on errors.
+
+        Returns (response, deployment that served it).
+        """
+        last_error = None
+        for deployment in self.candidates(route):
+            with self.lock:
+                deployment.in_flight += 1
+                deployment.calls += 1
+            start = time.perf_counter()
+            try:
+                response = deployment.scheduler.call(
+                    deployment.client.chat.completions.create,
+                    estimated_tokens,
+                    model=deployment.deployment,
+                    **kwargs
+                )
+            except RequestScheduler.RETRYABLE_ERRORS + (CircuitOpenError,) as e:
+                last_error = e
+                with self.lock:
+                    deployment.failures += 1
+                continue
+            finally:
+                with self.lock:
+                    deployment.in_flight -= 1
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                deployment.latency = elapsed if deployment.latency is None else (
+                    self.LATENCY_SMOOTHING * elapsed + (1 - self.LATENCY_SMOOTHING) * deployment.latency
+                )
+            return response, deployment
+        raise last_error
+
+    def to_dataframe(self):
+        with self.lock:
+            return pd.DataFrame([
+                {
+                    "Deployment": d.name,
+                    "Model": d.deployment,
+                    "Tier": d.tier,
+                    "Healthy": d.scheduler.available(),
+                    "In flight": d.in_flight,
+                    "Calls": d.calls,
+                    "Failures": d.failures,
+                    "Avg latency (s)": round(d.latency, 2) if d.latency is not None else None
+                }
+                for d in self.deployments
+            ])
+
+class AIResumeOptimizer(ResumeRenderer):
     def __init__(self):
         self.azure_client = None
+        self.usage = UsageTracker()
         self.setup_azure_openai()
+        self.parse_cache = DiskCache(
+            os.path.join(CACHE_DIR, "parsed_resumes.sqlite3"),
+            max_entries=int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "500"))
+        )
+        self.job_cache = DiskCache(
+            os.path.join(CACHE_DIR, "job_requirements.sqlite3"),
+            max_entries=int(os.getenv("JOB_CACHE_MAX_ENTRIES", "1000")),
+            ttl=float(os.getenv("JOB_CACHE_TTL_HOURS", "24")) * 3600
+        )
+        self.render_cache = RenderCache()
+        self.render_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prerender")
+        self.prerender_jobs = {}
+        self.prerender_lock = threading.Lock()
+        self.semantic_matcher = None
+        if self.embeddings_deployment:
+            self.semantic_matcher = SemanticMatcher(
+                self.azure_client,
+                self.embeddings_deployment,
+                DiskCache(
+                    os.path.join(CACHE_DIR, "embeddings.sqlite3"),
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+                ),
+                self.scheduler
+            )
     
     
     
@@ -138,17 +1522,36 @@ class AIResumeOptimizer:
             api_key = os.getenv("AZURE_OPENAI_API_KEY")
             api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-01")
             
-            if not endpoint or not api_key:
+            if not api_key or not (endpoint or os.getenv("AZURE_OPENAI_DEPLOYMENTS")):
                 st.error("Please set your Azure OpenAI credentials in the environment variables")
                 st.stop()
             
-            self.azure_client = AzureOpenAI(
-                azure_endpoint=endpoint,
-                api_key=api_key,
-                api_version=api_version
+            # One keep-alive connection pool shared by every session and
+            # pipeline thread, so calls skip the TCP/TLS handshake
+            pool_size = int(os.getenv("AZURE_OPENAI_POOL_SIZE", "20"))
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=float(os.getenv("AZURE_OPENAI_KEEPALIVE_SECONDS", "60"))
+                ),
+                timeout=httpx.Timeout(float(os.getenv("AZURE_OPENAI_TIMEOUT_SECONDS", "120")), connect=10.0)
             )
             
-            self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+            # Retries are handled by each deployment's RequestScheduler, not the SDK;
+            # the primary deployment also serves embeddings
+            self.deployments = DeploymentPool.from_env(http_client, api_key, api_version)
+            self.azure_client = self.deployments.primary.client
+            self.scheduler = self.deployments.primary.scheduler
+            self.deployment_name = self.deployments.primary.deployment
+            
+            # Strict JSON schema output needs API version 2024-08-01 or later;
+            # older versions get JSON mode plus a compact skeleton in the prompt.
+            # Calls fail over across the whole pool, so every deployment must
+            # support the chosen format
+            self.response_format_mode = os.getenv("AZURE_OPENAI_RESPONSE_FORMAT") or (
+                "json_schema" if self.deployments.oldest_api_version >= "2024-08-01" else "json_object"
+            )
             self.embeddings_deployment = os.getenv("AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME")
             
             if not self.deployment_name:
@@ -159,14 +1562,44 @@ class AIResumeOptimizer:
             st.error(f"Error setting up Azure OpenAI: {str(e)}")
             st.stop()
     
-    def extract_text_from_pdf(self, pdf_file):
-        """Extract text from PDF file"""
+    def create_chat_completion(self, task, messages, **kwargs):
+        """Call the deployment MODEL_ROUTES picks for `task` and record its telemetry"""
+        route = MODEL_ROUTES[task]
+        params = {"temperature": route["temperature"], "max_tokens": route["max_tokens"], **kwargs}
+        estimated_tokens = estimate_tokens("".join(message["content"] for message in messages))
+        start = time.perf_counter()
+        # Azure counts max_tokens against the tokens-per-minute quota
+        response, deployment = self.deployments.chat_completion(
+            estimated_tokens + params["max_tokens"],
+            route=route["route"],
+            messages=messages,
+            **params
+        )
+        # Streaming responses carry no usage or finish reason; their latency is time to first byte
+        choices = getattr(response, 'choices', None)
+        self.usage.record(
+            task, estimated_tokens, getattr(response, 'usage', None), time.perf_counter() - start,
+            deployment=deployment.name,
+            temperature=params["temperature"],
+            max_tokens=params["max_tokens"],
+            finish_reason=choices[0].finish_reason if choices else None
+        )
+        return response
+    
+    def structured_output(self, schema):
+        """Return (response_format, prompt schema text) for a TypedDict response schema"""
+        if self.response_format_mode == "json_schema":
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": schema.__name__, "schema": json_schema_for(schema), "strict": True}
+            }, ""
+        skeleton = json.dumps(schema_skeleton(schema), separators=(',', ':'))
+        return {"type": "json_object"}, f"Return JSON with exactly this structure:\n{skeleton}\n"
+    
+    def extract_text_from_pdf(self, pdf_file, on_page=None):
+        """Extract text from PDF file, calling on_page(page_number, page_count, seconds) per page"""
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            return pdf_to_text(pdf_file, on_page)
         except Exception as e:
             st.error(f"Error reading PDF: {str(e)}")
             return None
@@ -174,94 +1607,74 @@ class AIResumeOptimizer:
     def extract_text_from_docx(self, docx_file):
         """Extract text from DOCX file"""
         try:
-            doc = docx.Document(docx_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return docx_to_text(docx_file)
         except Exception as e:
             st.error(f"Error reading DOCX: {str(e)}")
             return None
     
+    def route_cache_tag(self, task):
+        """Everything about how `task` is served that changes its output:
+        the route's settings, the models it routes to and the response format"""
+        route = MODEL_ROUTES[task]
+        return json.dumps({
+            **route,
+            "models": self.deployments.route_models(route["route"]),
+            "response_format": self.response_format_mode
+        }, sort_keys=True)
+    
+    def parse_cache_key(self, text):
+        """Content address of a parse: normalized text + prompt version + model route"""
+        normalized_text = re.sub(r'\s+', ' ', text).strip()
+        return DiskCache.make_key(PARSE_PROMPT_VERSION, self.route_cache_tag('parse_resume'), normalized_text)
+    
     def ai_parse_resume(self, text):
-        """Use AI to intelligently parse resume text"""
+        """Use AI to intelligently parse resume text.
+
+        Resumes longer than PARSE_CHUNK_TOKENS are split by section, the
+        chunks are parsed concurrently and the partial results merged.
+        """
+        # Reruns and re-uploads of the same resume are served from the local cache
+        cache_key = self.parse_cache_key(text)
+        cached = self.parse_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            prompt = f"""
+            chunks = split_resume_text(text, PARSE_CHUNK_TOKENS)
+            if len(chunks) == 1:
+                resume_data = self.ai_parse_resume_text(text)
+            else:
+                pipeline = AIPipeline(max_workers=int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "4")))
+                try:
+                    names = []
+                    for index, chunk in enumerate(chunks):
+                        names.append(f"chunk_{index}")
+                        pipeline.add(names[-1], self.ai_parse_resume_text, chunk, index + 1, len(chunks))
+                    resume_data = merge_parsed_resumes([pipeline.result(name) for name in names])
+                finally:
+                    pipeline.shutdown()
+            
+            self.parse_cache.set(cache_key, resume_data)
+            return resume_data
+            
+        except Exception as e:
+            st.error(f"Error parsing resume with AI: {str(e)}")
+            return FallbackResume(self.fallback_parse_resume(text), error=f"Parsing failed: {str(e)}")
+    
+    def ai_parse_resume_text(self, text, part=1, parts=1):
+        """Parse resume text (or one chunk of it) into JSON with a single AI call"""
+        part_note = ""
+        if parts > 1:
+            part_note = f"\nThis is part {part} of {parts} of a longer resume. Extract only the information present in this part.\n"
+        
+        response_format, schema_prompt = self.structured_output(ResumeData)
+        prompt = f"""
 You are an expert resume parser. Extract and structure the following resume text into a comprehensive JSON format.
-
+{part_note}
 Resume Text:
 {text}
 
-Please extract and organize the information into this exact JSON structure:
-{{
-    "personal_info": {{
-        "name": "Full name",
-        "email": "email@example.com",
-        "phone": "phone number",
-        "location": "city, state/country",
-        "linkedin": "LinkedIn URL",
-        "website": "personal website if any",
-        "github": "GitHub profile if any"
-    }},
-    "summary": "Professional summary or objective statement",
-    "experience": [
-        {{
-            "title": "Job title",
-            "company": "Company name",
-            "location": "Work location",
-            "duration": "Start date - End date",
-            "description": [
-                "Achievement or responsibility 1",
-                "Achievement or responsibility 2"
-            ]
-        }}
-    ],
-    "skills": {{
-        "technical": ["skill1", "skill2"],
-        "programming": ["language1", "language2"],
-        "tools": ["tool1", "tool2"],
-        "soft_skills": ["skill1", "skill2"]
-    }},
-    "education": [
-        {{
-            "degree": "Degree type and major",
-            "school": "Institution name",
-            "location": "School location",
-            "year": "Graduation year",
-            "gpa": "GPA if mentioned",
-            "honors": "Any honors or distinctions"
-        }}
-    ],
-    "projects": [
-        {{
-            "name": "Project name",
-            "description": "Brief description",
-            "technologies": ["tech1", "tech2"],
-            "duration": "Project duration",
-            "url": "Project URL if any"
-        }}
-    ],
-    "certifications": [
-        {{
-            "name": "Certification name",
-            "issuer": "Issuing organization",
-            "date": "Date obtained",
-            "expiry": "Expiry date if any"
-        }}
-    ],
-    "languages": [
-        {{
-            "language": "Language name",
-            "proficiency": "Proficiency level"
-        }}
-    ],
-    "achievements": [
-        "Achievement 1",
-        "Achievement 2"
-    ]
-}}
-
-Important: 
+{schema_prompt}Important: 
 - Extract ALL information present in the resume
 - If information is not available, use null or empty array
 - Be thorough and accurate
@@ -269,90 +1682,84 @@ Important:
 - Return only valid JSON without any markdown formatting
 """
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume parser. Return only valid JSON data."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=4000
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Clean up response
-            if content.startswith('```json'):
-                content = content[7:-3]
-            elif content.startswith('```'):
-                content = content[3:-3]
-            
-            return json.loads(content)
-            
-        except Exception as e:
-            st.error(f"Error parsing resume with AI: {str(e)}")
-            return self.fallback_parse_resume(text)
+        response = self.create_chat_completion(
+            'parse_resume',
+            messages=[
+                {"role": "system", "content": "You are an expert resume parser. Return only valid JSON data."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=response_format
+        )
+        
+        return decode_json_response(response.choices[0].message.content, ResumeData)
+    
+    def job_cache_key(self, job_description):
+        """Cache key of a job posting: case, whitespace and boilerplate are ignored"""
+        normalized = job_description.lower()
+        for pattern in JOB_BOILERPLATE_PATTERNS:
+            normalized = re.sub(pattern, ' ', normalized)
+        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        return DiskCache.make_key(
+            JOB_REQUIREMENTS_PROMPT_VERSION, self.route_cache_tag('extract_job_requirements'), normalized
+        )
     
     def ai_extract_job_requirements(self, job_description):
         """Use AI to extract structured requirements from job description"""
+        # The same posting is analyzed once and shared by every session
+        cache_key = self.job_cache_key(job_description)
+        cached = self.job_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
+            response_format, schema_prompt = self.structured_output(JobRequirements)
             prompt = f"""
 Analyze this job description and extract key requirements in structured format:
 
 Job Description:
 {job_description}
 
-Extract and return as JSON:
-{{
-    "required_skills": ["skill1", "skill2"],
-    "preferred_skills": ["skill1", "skill2"],
-    "experience_level": "entry/mid/senior level",
-    "education_requirements": ["requirement1", "requirement2"],
-    "key_responsibilities": ["responsibility1", "responsibility2"],
-    "industry": "industry name",
-    "job_type": "full-time/part-time/contract",
-    "keywords": ["keyword1", "keyword2"],
-    "company_culture": ["value1", "value2"],
-    "must_have_technologies": ["tech1", "tech2"],
-    "nice_to_have_technologies": ["tech1", "tech2"]
-}}
-
-Return only valid JSON without markdown.
+Extract the key requirements as JSON.
+{schema_prompt}Return only valid JSON without markdown.
 """
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
+            response = self.create_chat_completion(
+                'extract_job_requirements',
                 messages=[
                     {"role": "system", "content": "You are an expert job requirement analyzer. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
-                max_tokens=2000
+                response_format=response_format
             )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content[7:-3]
-            elif content.startswith('```'):
-                content = content[3:-3]
-            
-            return json.loads(content)
+            job_requirements = decode_json_response(response.choices[0].message.content, JobRequirements)
+            # An empty analysis is never shared, so the posting is retried
+            if job_requirements:
+                self.job_cache.set(cache_key, job_requirements)
+            return job_requirements
             
         except Exception as e:
             st.error(f"Error analyzing job requirements: {str(e)}")
             return {}
     
-    def ai_optimize_resume(self, resume_data, job_requirements, job_description):
-        """Use AI to comprehensively optimize resume"""
+    def ai_optimize_resume(self, resume_data, job_requirements, job_description, on_section=None):
+        """Use AI to comprehensively optimize resume.
+
+        The completion is streamed; on_section(key, value) is called for each
+        top-level resume section as soon as it has been fully generated. A
+        truncated completion returns a FallbackResume, with the sections the
+        model never reached filled in from resume_data.
+        """
         try:
+            response_format, schema_prompt = self.structured_output(ResumeData)
             prompt = f"""
 You are an expert ATS resume optimizer. Optimize this resume to perfectly match the job requirements while maintaining truthfulness.
 
 Original Resume:
-{json.dumps(resume_data, indent=2)}
+{encode_for_prompt(resume_data)}
 
 Job Requirements:
-{json.dumps(job_requirements, indent=2)}
+{encode_for_prompt(job_requirements)}
 
 Job Description:
 {job_description}
@@ -374,103 +1781,261 @@ Return the optimized resume in the same JSON structure with these improvements:
 - ATS-friendly formatting
 - Strategic keyword placement
 
+{schema_prompt}
 Return only the JSON structure without any markdown formatting.
 """
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
+            response = self.create_chat_completion(
+                'optimize_resume',
                 messages=[
                     {"role": "system", "content": "You are an expert ATS resume optimizer. Return only valid JSON data."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=4000
+                stream=True,
+                response_format=response_format
             )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content[7:-3]
-            elif content.startswith('```'):
-                content = content[3:-3]
-            
-            return json.loads(content)
+            scanner = JSONSectionScanner()
+            parts = []
+            finish_reasons = []
+            for text in iter_stream_text(response, finish_reasons):
+                parts.append(text)
+                for key, value in scanner.feed(text):
+                    if on_section:
+                        on_section(key, value)
+            
+            optimized_resume = decode_json_response(''.join(parts), ResumeData)
+            # A truncated completion may be missing trailing sections, which
+            # keep their original text and must not count as optimized
+            missing = [
+                section for section in OPTIMIZED_SECTIONS
+                if resume_data.get(section) and section not in optimized_resume
+            ]
+            merged = {**resume_data, **optimized_resume}
+            if missing or 'length' in finish_reasons:
+                reason = f"missing {', '.join(missing)}" if missing else "the response was cut off"
+                return FallbackResume(merged, error=f"Optimization incomplete: {reason}")
+            return merged
             
         except Exception as e:
             st.error(f"Error optimizing resume: {str(e)}")
-            return resume_data
+            return FallbackResume(resume_data, error=f"Optimization failed: {str(e)}")
     
-    def ai_calculate_ats_score(self, resume_data, job_requirements):
-        """Use AI to calculate comprehensive ATS score"""
+    def ai_optimize_section(self, section, value, job_requirements, job_description):
+        """Use AI to optimize a single resume section (or one experience entry).
+
+        Raises on failure so the caller never mistakes the input for an
+        optimized value.
+        """
         try:
             prompt = f"""
-Analyze this resume against job requirements and calculate an ATS compatibility score.
+You are an expert ATS resume optimizer. Optimize this "{section}" section of a resume to match the job requirements while maintaining truthfulness.
+
+Section:
+{encode_for_prompt(value)}
+
+Job Requirements:
+{encode_for_prompt(job_requirements)}
+
+Job Description:
+{job_description}
+
+Optimization Instructions:
+1. Use relevant keywords from the job requirements
+2. Use action verbs and quantified achievements where possible
+3. Prioritize the most relevant items first
+4. Maintain all factual information - DO NOT fabricate experience
+
+Return JSON of the form {{"value": <optimized section in the same structure>}}.
+Return only valid JSON without any markdown formatting.
+"""
+
+            response = self.create_chat_completion(
+                'optimize_section',
+                messages=[
+                    {"role": "system", "content": "You are an expert ATS resume optimizer. Return only valid JSON data."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            
+            result = decode_json_response(response.choices[0].message.content)
+            if 'value' not in result:
+                raise ValueError("response has no \"value\" field")
+            return result['value']
+            
+        except Exception as e:
+            st.error(f"Error optimizing {section}: {str(e)}")
+            raise
+    
+    def ai_reoptimize_resume(self, resume_data, job_requirements, job_description, previous_source, previous_optimized):
+        """Re-optimize only the sections that changed since the last optimization.
+
+        previous_source is the resume that produced previous_optimized for the
+        same job description. Unchanged sections are reused, changed sections
+        and experience entries are optimized in parallel and merged back in
+        the order of the current resume. Sections whose optimization failed
+        keep their current value and the result is a FallbackResume.
+        """
+        merged = {}
+        failed = False
+        
+        def result_or_source(future, source):
+            nonlocal failed
+            try:
+                return future.result()
+            except Exception:
+                failed = True
+                return source
+        
+        pipeline = AIPipeline(max_workers=int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "4")))
+        try:
+            for section, value in resume_data.items():
+                if section == 'experience' and isinstance(value, list):
+                    merged[section] = self._reoptimize_entries(
+                        pipeline, value, previous_source.get(section), previous_optimized.get(section),
+                        job_requirements, job_description
+                    )
+                elif value == previous_source.get(section) and section in previous_optimized:
+                    merged[section] = previous_optimized[section]
+                elif section in OPTIMIZED_SECTIONS and value:
+                    merged[section] = pipeline.add(
+                        section, self.ai_optimize_section, section, value, job_requirements, job_description
+                    )
+                else:
+                    merged[section] = value
+            
+            # Swap the scheduled calls for their results
+            for section, value in merged.items():
+                if isinstance(value, Future):
+                    merged[section] = result_or_source(value, resume_data[section])
+                elif isinstance(value, list):
+                    merged[section] = [
+                        result_or_source(item, resume_data[section][index]) if isinstance(item, Future) else item
+                        for index, item in enumerate(value)
+                    ]
+            return FallbackResume(merged, error="Some sections could not be optimized") if failed else merged
+        finally:
+            pipeline.shutdown()
+    
+    def _reoptimize_entries(self, pipeline, entries, previous_entries, previous_optimized, job_requirements, job_description):
+        """Reuse optimized experience entries that did not change, schedule the rest"""
+        reusable = {}
+        # Previous entries can only be mapped to their optimized versions by
+        # position when the optimizer kept the list intact
+        if isinstance(previous_entries, list) and isinstance(previous_optimized, list) \
+                and len(previous_entries) == len(previous_optimized):
+            for old_entry, optimized_entry in zip(previous_entries, previous_optimized):
+                reusable[json.dumps(old_entry, sort_keys=True)] = optimized_entry
+        
+        results = []
+        for index, entry in enumerate(entries):
+            key = json.dumps(entry, sort_keys=True)
+            if key in reusable:
+                results.append(reusable[key])
+            else:
+                results.append(pipeline.add(
+                    f"experience_{index}", self.ai_optimize_section,
+                    "experience entry", entry, job_requirements, job_description
+                ))
+        return results
+    
+    def local_ats_score(self, resume_data, job_requirements):
+        """Score a resume locally, without an LLM call"""
+        scorer = get_local_scorer(json.dumps(job_requirements or {}, sort_keys=True))
+        analysis = scorer.score(resume_data)
+        analysis['overall_score'] = overall_ats_score(analysis)
+        return analysis
+    
+    def semantic_match(self, resume_data, job_requirements):
+        """Embedding-based requirement alignment, or None without an embeddings deployment"""
+        if self.semantic_matcher is None:
+            return None
+        try:
+            return self.semantic_matcher.match(resume_data, job_requirements)
+        except Exception as e:
+            st.error(f"Error computing semantic match: {str(e)}")
+            return None
+    
+    def semantic_rank_jobs(self, resume_data, job_requirements_list):
+        """Semantic fit of one resume for each job, or None without an embeddings deployment"""
+        if self.semantic_matcher is None:
+            return None
+        try:
+            return self.semantic_matcher.rank_jobs(resume_data, job_requirements_list)
+        except Exception as e:
+            st.error(f"Error ranking jobs semantically: {str(e)}")
+            return None
+    
+    def ai_calculate_ats_score(self, resume_data, job_requirements, include_insights=True):
+        """Calculate comprehensive ATS score.
+
+        Keyword, skills, structure and achievement scores come from the local
+        scorer; the LLM is only asked for the qualitative fields when
+        include_insights is set.
+        """
+        analysis = self.local_ats_score(resume_data, job_requirements)
+        if not include_insights:
+            return analysis
+        
+        try:
+            response_format, schema_prompt = self.structured_output(ATSInsights)
+            prompt = f"""
+Analyze this resume against job requirements for ATS compatibility.
+Keyword matching has already been done: the resume matches {json.dumps(analysis['matched_keywords'])} and misses {json.dumps(analysis['missing_keywords'])}.
 
 Resume:
-{json.dumps(resume_data, indent=2)}
+{encode_for_prompt(resume_data)}
 
 Job Requirements:
-{json.dumps(job_requirements, indent=2)}
-
-Evaluate based on:
-1. Keyword matching (30%)
-2. Skills alignment (25%)
-3. Experience relevance (20%)
-4. Education requirements (10%)
-5. Resume structure/formatting (10%)
-6. Achievement quantification (5%)
-
-Return analysis as JSON:
-{{
-    "overall_score": 85,
-    "keyword_score": 80,
-    "skills_score": 90,
-    "experience_score": 85,
-    "education_score": 75,
-    "structure_score": 95,
-    "achievement_score": 70,
-    "matched_keywords": ["keyword1", "keyword2"],
-    "missing_keywords": ["keyword1", "keyword2"],
-    "strengths": ["strength1", "strength2"],
-    "improvements": ["improvement1", "improvement2"],
-    "ats_recommendations": ["rec1", "rec2"]
-}}
-
-Return only valid JSON.
+{encode_for_prompt(job_requirements)}
+
+Evaluate:
+1. Experience relevance (0-100)
+2. Education requirements (0-100)
+3. Key strengths and improvement areas
+
+Return the analysis as JSON.
+{schema_prompt}Return only valid JSON.
 """
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
+            response = self.create_chat_completion(
+                'calculate_ats_score',
                 messages=[
                     {"role": "system", "content": "You are an ATS scoring expert. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
-                max_tokens=2000
+                response_format=response_format
             )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content[7:-3]
-            elif content.startswith('```'):
-                content = content[3:-3]
-            
-            return json.loads(content)
+            insights = decode_json_response(response.choices[0].message.content, ATSInsights)
+            for key in ('experience_score', 'education_score', 'strengths', 'improvements', 'ats_recommendations'):
+                if key in insights:
+                    analysis[key] = insights[key]
+            analysis['overall_score'] = overall_ats_score(analysis)
+            return analysis
             
         except Exception as e:
             st.error(f"Error calculating ATS score: {str(e)}")
-            return {"overall_score": 0, "error": str(e)}
+            analysis['error'] = str(e)
+            return analysis
     
     def ai_generate_cover_letter(self, resume_data, job_requirements, job_description, company_name=""):
         """Generate personalized cover letter"""
+        return "".join(
+            self.ai_generate_cover_letter_stream(resume_data, job_requirements, job_description, company_name)
+        ).strip()
+    
+    def ai_generate_cover_letter_stream(self, resume_data, job_requirements, job_description, company_name=""):
+        """Generate personalized cover letter, yielding text as it is written"""
         try:
             prompt = f"""
 Write a compelling, personalized cover letter based on this resume and job requirements.
 
 Resume Data:
-{json.dumps(resume_data, indent=2)}
+{encode_for_prompt(resume_data)}
 
 Job Requirements:
-{json.dumps(job_requirements, indent=2)}
+{encode_for_prompt(job_requirements)}
 
 Company: {company_name}
 Job Description: {job_description}
@@ -487,33 +2052,32 @@ Requirements:
 Return as plain text, ready to use.
 """
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
+            response = self.create_chat_completion(
+                'generate_cover_letter',
                 messages=[
                     {"role": "system", "content": "You are an expert cover letter writer."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.4,
-                max_tokens=1500
+                stream=True
             )
             
-            return response.choices[0].message.content.strip()
+            yield from iter_stream_text(response)
             
         except Exception as e:
             st.error(f"Error generating cover letter: {str(e)}")
-            return ""
     
     def ai_suggest_improvements(self, resume_data, ats_analysis):
         """Get AI-powered improvement suggestions"""
         try:
+            response_format, schema_prompt = self.structured_output(Suggestions)
             prompt = f"""
 Based on this resume and ATS analysis, provide specific, actionable improvement suggestions.
 
 Resume:
-{json.dumps(resume_data, indent=2)}
+{encode_for_prompt(resume_data)}
 
 ATS Analysis:
-{json.dumps(ats_analysis, indent=2)}
+{encode_for_prompt(ats_analysis)}
 
 Provide detailed suggestions in categories:
 1. Content improvements
@@ -522,40 +2086,223 @@ Provide detailed suggestions in categories:
 4. Skills development
 5. Experience enhancement
 
-Return as JSON:
-{{
-    "content_improvements": ["suggestion1", "suggestion2"],
-    "keyword_optimization": ["suggestion1", "suggestion2"],
-    "formatting_enhancements": ["suggestion1", "suggestion2"],
-    "skills_development": ["suggestion1", "suggestion2"],
-    "experience_enhancement": ["suggestion1", "suggestion2"],
-    "quick_wins": ["quick fix 1", "quick fix 2"],
-    "long_term_goals": ["goal1", "goal2"]
-}}
-"""
+Return the suggestions as JSON, including quick wins and long-term goals.
+{schema_prompt}"""
 
-            response = self.azure_client.chat.completions.create(
-                model=self.deployment_name,
+            response = self.create_chat_completion(
+                'suggest_improvements',
                 messages=[
-                    {"role": "system", "content": "You are a career development expert."},
+                    {"role": "system", "content": "You are a career development expert. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=2000
+                response_format=response_format
             )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content[7:-3]
-            elif content.startswith('```'):
-                content = content[3:-3]
-            
-            return json.loads(content)
+            return decode_json_response(response.choices[0].message.content, Suggestions)
             
         except Exception as e:
             st.error(f"Error generating suggestions: {str(e)}")
             return {}
     
+    def schedule_optimization(self, pipeline, job_description, on_section=None, previous=None,
+                              speculative_cover_letter=False, company_name=""):
+        """Add optimize -> score -> suggest steps to a pipeline.
+
+        The pipeline must already hold (or be computing) `resume_data` and
+        `job_requirements`; optimization starts the moment both are ready.
+        on_section is forwarded to ai_optimize_resume. When `previous` holds
+        the (source resume, optimized resume) of an earlier run for the same
+        job description, only the changed sections are re-optimized. With
+        speculative_cover_letter, a `cover_letter` step is written alongside
+        scoring in case the user asks for one. With an embeddings deployment,
+        a `semantic_match` step aligns the optimized resume with the job.
+        """
+        if previous is not None:
+            pipeline.add(
+                'optimized_resume', self.ai_reoptimize_resume, job_description, *previous,
+                depends_on=('resume_data', 'job_requirements')
+            )
+        else:
+            pipeline.add(
+                'optimized_resume', self.ai_optimize_resume, job_description,
+                depends_on=('resume_data', 'job_requirements'),
+                on_section=on_section
+            )
+        pipeline.add(
+            'ats_analysis', self.ai_calculate_ats_score,
+            depends_on=('optimized_resume', 'job_requirements')
+        )
+        if self.semantic_matcher is not None:
+            pipeline.add(
+                'semantic_match', self.semantic_match,
+                depends_on=('optimized_resume', 'job_requirements')
+            )
+        pipeline.add(
+            'ai_suggestions', self.ai_suggest_improvements,
+            depends_on=('optimized_resume', 'ats_analysis')
+        )
+        if speculative_cover_letter:
+            pipeline.add(
+                'cover_letter', self.ai_generate_cover_letter, job_description, company_name,
+                depends_on=('optimized_resume', 'job_requirements')
+            )
+        return pipeline
+    
+    def optimize_for_job(self, resume_data, job_description):
+        """Run extract -> optimize -> score for a single job description"""
+        job_requirements = self.ai_extract_job_requirements(job_description)
+        optimized_resume = self.ai_optimize_resume(resume_data, job_requirements, job_description)
+        ats_analysis = self.ai_calculate_ats_score(optimized_resume, job_requirements)
+        return {
+            'job_title': summarize_job_title(job_description),
+            'job_description': job_description,
+            'job_requirements': job_requirements,
+            'optimized_resume': optimized_resume,
+            'ats_analysis': ats_analysis
+        }
+    
+    def prerender(self, resume_data):
+        """Start rendering resume_data as PDF and DOCX in the background.
+
+        Returns {format: Future of document bytes}. Repeated calls for the
+        same resume share the in-flight render or the cached bytes.
+        """
+        jobs = {}
+        with self.prerender_lock:
+            # Finished renders live on in render_cache; drop their futures
+            for key in [key for key, future in self.prerender_jobs.items() if future.done()]:
+                del self.prerender_jobs[key]
+            for fmt in RENDER_FORMATS:
+                key = RenderCache.make_key(resume_data, fmt)
+                future = self.prerender_jobs.get(key)
+                if future is None:
+                    cached = self.render_cache.get(key)
+                    if cached is not None:
+                        future = Future()
+                        future.set_result(cached)
+                    else:
+                        future = self.render_executor.submit(self.render, copy.deepcopy(resume_data), fmt)
+                        self.prerender_jobs[key] = future
+                jobs[fmt] = future
+        return jobs
+    
+    def ai_batch_optimize(self, resume_data, job_descriptions, max_concurrency=None):
+        """Optimize one resume against many job descriptions in parallel.
+
+        At most `max_concurrency` jobs (AZURE_OPENAI_MAX_CONCURRENCY, default 4)
+        are in flight at once, so each job has a single LLM call outstanding and
+        the deployment's rate limit is respected. Yields (index, result) as
+        each job finishes. Once all jobs are done, every result gets a
+        'semantic_fit' score for the original resume, computed against all
+        jobs with one embedding comparison, when embeddings are configured.
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "4"))
+        
+        pipeline = AIPipeline(max_workers=max_concurrency)
+        names = []
+        for index, job_description in enumerate(job_descriptions):
+            name = f"job_{index}"
+            pipeline.add(name, self.optimize_for_job, resume_data, job_description)
+            names.append(name)
+        
+        results = {}
+        try:
+            for name, result in pipeline.as_completed(names):
+                results[int(name.split('_')[1])] = result
+                yield int(name.split('_')[1]), result
+        finally:
+            pipeline.shutdown()
+        
+        indexes = sorted(results)
+        fit_scores = self.semantic_rank_jobs(
+            resume_data, [results[index].get('job_requirements') or {} for index in indexes]
+        )
+        for index, score in zip(indexes, fit_scores or []):
+            results[index]['semantic_fit'] = score
+    
+    def score_candidate(self, filename, text, job_requirements):
+        """Parse and score one candidate resume.
+
+        Transient API errors are already retried by the request scheduler,
+        so a failure here is final and shows up in the Error column. A
+        resume that could not be parsed is not scored.
+        """
+        resume_data = self.ai_parse_resume(text)
+        if isinstance(resume_data, FallbackResume):
+            ats_analysis = {'error': resume_data.error}
+        else:
+            ats_analysis = self.ai_calculate_ats_score(resume_data, job_requirements)
+        
+        personal_info = resume_data.get('personal_info') or {}
+        return {
+            'Candidate': personal_info.get('name') or os.path.splitext(filename)[0],
+            'File': filename,
+            'ATS Score': ats_analysis.get('overall_score', 0),
+            'Keyword Match': ats_analysis.get('keyword_score', 0),
+            'Skills Alignment': ats_analysis.get('skills_score', 0),
+            'Experience Match': ats_analysis.get('experience_score', 0),
+            'Education Match': ats_analysis.get('education_score', 0),
+            'Matched Keywords': ", ".join(ats_analysis.get('matched_keywords', [])),
+            'Missing Keywords': ", ".join(ats_analysis.get('missing_keywords', [])),
+            'Error': ats_analysis.get('error', '')
+        }
+    
+    def ai_screen_resumes(self, files, job_description, leaderboard_path, max_concurrency=None):
+        """Score many resumes against one job description.
+
+        Job requirements are extracted once and shared by every candidate;
+        raises ValueError when none could be extracted. Text extraction runs
+        in a process pool and each resume is parsed and scored, with bounded
+        concurrency, as soon as its text is ready. Each finished candidate is
+        appended to the CSV leaderboard at `leaderboard_path` and yielded as
+        a row dict.
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "4"))
+        
+        job_requirements = self.ai_extract_job_requirements(job_description)
+        # Scoring against no requirements would spend every call for nothing
+        if not job_requirements:
+            raise ValueError("Job requirements could not be extracted, so no candidates were screened")
+        
+        os.makedirs(os.path.dirname(os.path.abspath(leaderboard_path)), exist_ok=True)
+        pipeline = AIPipeline(max_workers=max_concurrency)
+        try:
+            with open(leaderboard_path, 'w', newline='', encoding='utf-8') as leaderboard:
+                writer = csv.DictWriter(leaderboard, fieldnames=LEADERBOARD_COLUMNS)
+                writer.writeheader()
+                
+                def write_row(future):
+                    row = future.result()
+                    writer.writerow(row)
+                    leaderboard.flush()
+                    return row
+                
+                # Finished candidates are written while extraction continues
+                completed = queue.Queue()
+                submitted = written = 0
+                for filename, text, error in extract_many(files):
+                    name = f"candidate_{submitted}"
+                    if text and text.strip():
+                        future = pipeline.add(name, self.score_candidate, filename, text, job_requirements)
+                    else:
+                        row = dict.fromkeys(LEADERBOARD_COLUMNS, '')
+                        row.update({'Candidate': filename, 'File': filename, 'ATS Score': 0,
+                                    'Error': error or "No text could be extracted"})
+                        future = pipeline.add_result(name, row)
+                    future.add_done_callback(completed.put)
+                    submitted += 1
+                    while not completed.empty():
+                        written += 1
+                        yield write_row(completed.get())
+                
+                while written < submitted:
+                    written += 1
+                    yield write_row(completed.get())
+        finally:
+            pipeline.shutdown()
+    
     def fallback_parse_resume(self, text):
         """Fallback parser if AI fails"""
         return {
@@ -569,882 +2316,21 @@ Return as JSON:
             "languages": [],
             "achievements": []
         }
-    
-    def generate_pdf_resume(self, resume_data):
-        """Generate professional PDF resume with proper alignment and formatting"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=letter, 
-            rightMargin=40, 
-            leftMargin=40,
-            topMargin=40, 
-            bottomMargin=40
-        )
-        
-        # Get styles and create custom ones
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Enhanced custom styles with better alignment
-        name_style = ParagraphStyle(
-            'NameStyle',
-            parent=styles['Title'],
-            fontSize=20,
-            fontName='Helvetica-Bold',
-            textColor=black,
-            alignment=1,  # Center align for name
-            spaceAfter=6,
-            spaceBefore=0
-        )
-        
-        title_style = ParagraphStyle(
-            'TitleStyle',
-            parent=styles['Normal'],
-            fontSize=12,
-            fontName='Helvetica',
-            textColor=black,
-            alignment=1,  # Center align for title
-            spaceAfter=12,
-            spaceBefore=0
-        )
-        
-        contact_style = ParagraphStyle(
-            'ContactStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            fontName='Helvetica',
-            textColor=black,
-            alignment=0,  # Left align
-            spaceAfter=2,
-            spaceBefore=0,
-            leftIndent=0,
-            rightIndent=0
-        )
-        
-        section_heading_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Heading2'],
-            fontSize=13,
-            fontName='Helvetica-Bold',
-            textColor=black,
-            alignment=0,  # Left align
-            spaceAfter=10,
-            spaceBefore=16,
-            borderWidth=1,
-            borderColor=black,
-            borderPadding=2,
-            keepWithNext=True,  # Prevent orphaned headers
-            pageBreakBefore=0,  # Allow page breaks before if needed
-            splitLongWords=False
-        )
-        
-        subsection_style = ParagraphStyle(
-            'SubsectionStyle',
-            parent=styles['Normal'],
-            fontSize=11,
-            fontName='Helvetica-Bold',
-            textColor=black,
-            alignment=0,
-            spaceAfter=4,
-            spaceBefore=8,
-            keepWithNext=True
-        )
-        
-        body_style = ParagraphStyle(
-            'BodyStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            fontName='Helvetica',
-            textColor=black,
-            alignment=4,  # Justify
-            spaceAfter=4,
-            spaceBefore=0,
-            leftIndent=0,
-            rightIndent=0
-        )
-        
-        bullet_style = ParagraphStyle(
-            'BulletStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            fontName='Helvetica',
-            textColor=black,
-            alignment=0,
-            spaceAfter=3,
-            spaceBefore=0,
-            leftIndent=15,
-            bulletIndent=10,
-            bulletFontName='Symbol'
-        )
-        
-        # Helper function to add section with proper formatting and page break protection
-        def add_section_header(text):
-            from reportlab.platypus import KeepTogether, PageBreak
-            
-            # Create header paragraph with page break protection
-            header_para = Paragraph(f'<b>{text.upper()}</b>', section_heading_style)
-            
-            # Add a thin line under section headers
-            from reportlab.platypus import HRFlowable
-            hr_line = HRFlowable(width="100%", thickness=1, lineCap='round', color=black)
-            spacer = Spacer(1, 4)
-            
-            # Group header, line, and spacer together to prevent separation
-            header_group = KeepTogether([header_para, hr_line, spacer])
-            story.append(header_group)
-        
-        # HEADER SECTION WITH IMPROVED ALIGNMENT
-        personal_info = resume_data.get('personal_info', {})
-        
-        # Name - centered and prominent
-        if personal_info.get('name'):
-            story.append(Paragraph(f"<b>{personal_info['name'].upper()}</b>", name_style))
-        
-        # Professional title - centered
-        title_text = "AI Engineer | Full Stack Developer | DevOps Specialist"
-        if resume_data.get('summary'):
-            summary = resume_data['summary']
-            # Extract professional roles from summary if available
-            if any(role in summary.lower() for role in ['engineer', 'developer', 'analyst', 'specialist']):
-                title_text = self.extract_professional_title(summary)
-        
-        story.append(Paragraph(title_text, title_style))
-        story.append(Spacer(1, 8))
-        
-        # Contact information in properly aligned table
-        contact_data = self.create_contact_table(personal_info)
-        if contact_data:
-            from reportlab.platypus import Table, TableStyle
-            from reportlab.lib import colors
-            
-            # Create balanced contact table
-            contact_table = Table(contact_data, colWidths=[2.8*inch, 2.8*inch])
-            contact_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),   # Left column left-aligned
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Right column right-aligned
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.white),  # Invisible grid for spacing
-            ]))
-            story.append(contact_table)
-        
-        story.append(Spacer(1, 16))
-        
-        # PROFESSIONAL SUMMARY with proper formatting
-        if resume_data.get('summary'):
-            add_section_header("PROFESSIONAL SUMMARY")
-            summary_para = Paragraph(resume_data['summary'], body_style)
-            story.append(summary_para)
-            story.append(Spacer(1, 12))
-        
-        # CORE COMPETENCIES with left-aligned layout, page break protection, and proper text wrapping
-        skills = resume_data.get('skills', {})
-        if skills:
-            add_section_header("CORE COMPETENCIES")
-            
-            # Organize skills in a clean table format with Paragraph objects
-            skill_table_data = self.organize_skills_table_with_paragraphs(skills, body_style)
-            if skill_table_data:
-                # Fixed column widths for better alignment - adjust for wrapping
-                skills_table = Table(skill_table_data, colWidths=[1.5*inch, 4.2*inch])
-                skills_table.setStyle(TableStyle([
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),  # Category names bold
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),              # Top align for multi-line content
-                    ('ALIGN', (0, 0), (0, -1), 'LEFT'),               # Left-align category labels
-                    ('ALIGN', (1, 0), (1, -1), 'LEFT'),               # Left-align skills
-                    ('LEFTPADDING', (0, 0), (0, -1), 0),              # No left padding for categories
-                    ('RIGHTPADDING', (0, 0), (0, -1), 10),            # Right padding for categories
-                    ('LEFTPADDING', (1, 0), (1, -1), 10),             # Left padding for skills
-                    ('RIGHTPADDING', (1, 0), (1, -1), 5),             # Small right padding for skills
-                    ('TOPPADDING', (0, 0), (-1, -1), 4),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                    ('GRID', (0, 0), (-1, -1), 0, colors.white),      # No visible grid
-                ]))
-                # Ensure table stays with header
-                skills_table.keepWithNext = True
-                story.append(skills_table)
-            
-            story.append(Spacer(1, 12))
-        
-        # WORK EXPERIENCE with consistent formatting and page break protection
-        if resume_data.get('experience'):
-            add_section_header("PROFESSIONAL EXPERIENCE")
-            
-            for i, exp in enumerate(resume_data['experience']):
-                # Create experience block that stays together
-                exp_elements = []
-                
-                # Job title in bold
-                if exp.get('title'):
-                    title_para = Paragraph(f"<b>{exp['title']}</b>", subsection_style)
-                    exp_elements.append(title_para)
-                
-                # Company, location, and duration in organized format
-                exp_info = self.format_experience_header(exp)
-                if exp_info:
-                    company_para = Paragraph(exp_info, body_style)
-                    exp_elements.append(company_para)
-                
-                # Job responsibilities with proper bullet formatting
-                if exp.get('description'):
-                    if isinstance(exp['description'], list):
-                        for desc in exp['description']:
-                            if desc.strip():
-                                bullet_para = Paragraph(f"• {desc}", bullet_style)
-                                exp_elements.append(bullet_para)
-                    else:
-                        bullet_para = Paragraph(f"• {exp['description']}", bullet_style)
-                        exp_elements.append(bullet_para)
-                
-                # Keep experience block together
-                from reportlab.platypus import KeepTogether
-                if exp_elements:
-                    exp_block = KeepTogether(exp_elements)
-                    story.append(exp_block)
-                
-                # Add spacing between experiences
-                if i < len(resume_data['experience']) - 1:
-                    story.append(Spacer(1, 10))
-            
-            story.append(Spacer(1, 12))
-        
-        # KEY PROJECTS with enhanced formatting and page break protection
-        if resume_data.get('projects'):
-            add_section_header("KEY PROJECTS")
-            
-            for i, project in enumerate(resume_data['projects']):
-                # Create project block that stays together
-                project_elements = []
-                
-                # Project name and duration
-                project_header = self.format_project_header(project)
-                if project_header:
-                    header_para = Paragraph(project_header, subsection_style)
-                    project_elements.append(header_para)
-                
-                # Project description and details
-                if project.get('description'):
-                    if isinstance(project['description'], list):
-                        for desc in project['description']:
-                            if desc.strip():
-                                desc_para = Paragraph(f"• {desc}", bullet_style)
-                                project_elements.append(desc_para)
-                    else:
-                        desc_para = Paragraph(f"• {project['description']}", bullet_style)
-                        project_elements.append(desc_para)
-                
-                # Technologies with proper formatting
-                if project.get('technologies'):
-                    tech_text = self.format_technologies(project['technologies'])
-                    tech_para = Paragraph(f"• <b>Technologies:</b> {tech_text}", bullet_style)
-                    project_elements.append(tech_para)
-                
-                # Keep project block together
-                from reportlab.platypus import KeepTogether
-                if project_elements:
-                    project_block = KeepTogether(project_elements)
-                    story.append(project_block)
-                
-                if i < len(resume_data['projects']) - 1:
-                    story.append(Spacer(1, 8))
-            
-            story.append(Spacer(1, 12))
-        
-        # EDUCATION with consistent alignment and page break protection
-        if resume_data.get('education'):
-            add_section_header("EDUCATION")
-            
-            for edu in resume_data['education']:
-                # Create education block that stays together
-                edu_elements = []
-                
-                # Degree in bold
-                if edu.get('degree'):
-                    degree_para = Paragraph(f"<b>{edu['degree']}</b>", subsection_style)
-                    edu_elements.append(degree_para)
-                
-                # School and details
-                edu_info = self.format_education_info(edu)
-                if edu_info:
-                    school_para = Paragraph(edu_info, body_style)
-                    edu_elements.append(school_para)
-                
-                # Additional details (GPA, honors, etc.)
-                edu_details = self.format_education_details(edu)
-                if edu_details:
-                    for detail in edu_details:
-                        detail_para = Paragraph(detail, body_style)
-                        edu_elements.append(detail_para)
-                
-                # Keep education block together
-                from reportlab.platypus import KeepTogether
-                if edu_elements:
-                    edu_block = KeepTogether(edu_elements)
-                    story.append(edu_block)
-                
-                story.append(Spacer(1, 6))
-        
-        # CERTIFICATIONS with organized layout
-        if resume_data.get('certifications'):
-            add_section_header("CERTIFICATIONS")
-            
-            for cert in resume_data['certifications']:
-                cert_text = self.format_certification(cert)
-                if cert_text:
-                    story.append(Paragraph(f"• {cert_text}", bullet_style))
-            
-            story.append(Spacer(1, 8))
-        
-        # ACHIEVEMENTS with proper formatting
-        if resume_data.get('achievements'):
-            add_section_header("ACHIEVEMENTS AND RECOGNITION")
-            
-            for achievement in resume_data['achievements']:
-                story.append(Paragraph(f"• {achievement}", bullet_style))
-        
-        # Build the PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
-
-    def create_contact_table(self, personal_info):
-        """Create properly formatted contact information table"""
-        contact_left = []
-        contact_right = []
-        
-        # Organize contact info in two balanced columns
-        if personal_info.get('location'):
-            contact_left.append(f"Location: {personal_info['location']}")
-        if personal_info.get('linkedin'):
-            linkedin_display = personal_info['linkedin'].replace('https://', '').replace('http://', '')
-            contact_left.append(f"LinkedIn: {linkedin_display}")
-        
-        if personal_info.get('phone'):
-            contact_right.append(f"Mobile: {personal_info['phone']}")
-        if personal_info.get('email'):
-            contact_right.append(f"Email: {personal_info['email']}")
-        if personal_info.get('github'):
-            github_display = personal_info['github'].replace('https://', '').replace('http://', '')
-            contact_right.append(f"GitHub: {github_display}")
-        
-        # Create balanced table data
-        contact_data = []
-        max_items = max(len(contact_left), len(contact_right))
-        
-        for i in range(max_items):
-            left_item = contact_left[i] if i < len(contact_left) else ""
-            right_item = contact_right[i] if i < len(contact_right) else ""
-            contact_data.append([left_item, right_item])
-        
-        return contact_data if contact_data else None
-
-    def organize_skills_table_with_paragraphs(self, skills, body_style):
-        """Organize skills into table format using Paragraph objects for proper wrapping"""
-        skill_table_data = []
-        
-        # Create a style for skills with wrapping
-        skills_style = ParagraphStyle(
-            'SkillsStyle',
-            parent=body_style,
-            fontSize=10,
-            fontName='Helvetica',
-            textColor=black,
-            alignment=0,  # Left align
-            spaceAfter=0,
-            spaceBefore=0,
-            leftIndent=0,
-            rightIndent=0,
-            wordWrap='LTR'
-        )
-        
-        # Create a style for category labels
-        category_style = ParagraphStyle(
-            'CategoryStyle',
-            parent=body_style,
-            fontSize=10,
-            fontName='Helvetica-Bold',
-            textColor=black,
-            alignment=0,  # Left align
-            spaceAfter=0,
-            spaceBefore=0
-        )
-        
-        if isinstance(skills, dict):
-            # Define skill categories and their display order
-            skill_categories = {
-                'programming': 'Programming',
-                'technical': 'Technical',
-                'ai_ml': 'AI/ML',
-                'cloud': 'Cloud',
-                'tools': 'Tools & Platforms',
-                'databases': 'Databases',
-                'frameworks': 'Frameworks',
-                'soft_skills': 'Soft Skills'
-            }
-            
-            # Categorize skills intelligently
-            categorized_skills = self.categorize_skills_intelligently(skills)
-            
-            for category_key, category_name in skill_categories.items():
-                if categorized_skills.get(category_key):
-                    # Create category paragraph
-                    category_para = Paragraph(f"{category_name}:", category_style)
-                    
-                    # Format skills with proper wrapping using Paragraph
-                    skills_text = ", ".join(categorized_skills[category_key])
-                    skills_para = Paragraph(skills_text, skills_style)
-                    
-                    skill_table_data.append([category_para, skills_para])
-        
-        elif isinstance(skills, list):
-            category_para = Paragraph("Technical Skills:", category_style)
-            skills_text = ", ".join(skills)
-            skills_para = Paragraph(skills_text, skills_style)
-            skill_table_data.append([category_para, skills_para])
-        
-        return skill_table_data
 
-    def organize_skills_table(self, skills):
-        """Organize skills into a clean table format with proper alignment and text wrapping"""
-        skill_table_data = []
-        
-        if isinstance(skills, dict):
-            # Define skill categories and their display order
-            skill_categories = {
-                'programming': 'Programming',
-                'technical': 'Technical',
-                'ai_ml': 'AI/ML',
-                'cloud': 'Cloud',
-                'tools': 'Tools & Platforms',
-                'databases': 'Databases',
-                'frameworks': 'Frameworks',
-                'soft_skills': 'Soft Skills'
-            }
-            
-            # Categorize skills intelligently
-            categorized_skills = self.categorize_skills_intelligently(skills)
-            
-            for category_key, category_name in skill_categories.items():
-                if categorized_skills.get(category_key):
-                    # Format skills with proper wrapping
-                    skills_text = self.format_skills_with_wrapping(categorized_skills[category_key])
-                    # Ensure consistent formatting with colon
-                    skill_table_data.append([f"{category_name}:", skills_text])
-        
-        elif isinstance(skills, list):
-            skills_text = self.format_skills_with_wrapping(skills)
-            skill_table_data.append(["Technical Skills:", skills_text])
-        
-        return skill_table_data
-
-    def format_skills_with_wrapping(self, skills_list, max_line_length=80):
-        """Format skills list with proper line breaks to prevent overflow"""
-        if not skills_list:
-            return ""
-        
-        # Join skills with commas
-        skills_text = ", ".join(skills_list)
-        
-        # If the text is short enough, return as is
-        if len(skills_text) <= max_line_length:
-            return skills_text
-        
-        # Break into multiple lines while keeping skills together
-        lines = []
-        current_line = ""
-        
-        for skill in skills_list:
-            # Check if adding this skill would exceed line length
-            if current_line and len(current_line + ", " + skill) > max_line_length:
-                # Add current line and start new one
-                lines.append(current_line)
-                current_line = skill
-            else:
-                # Add to current line
-                if current_line:
-                    current_line += ", " + skill
-                else:
-                    current_line = skill
-        
-        # Add the last line
-        if current_line:
-            lines.append(current_line)
-        
-        # Join lines with line breaks
-        return "<br/>".join(lines)
-
-    def categorize_skills_intelligently(self, skills):
-        """Intelligently categorize skills based on keywords"""
-        categorized = {
-            'programming': [],
-            'ai_ml': [],
-            'cloud': [],
-            'tools': [],
-            'databases': [],
-            'frameworks': [],
-            'technical': []
-        }
-        
-        # Define keyword mappings
-        category_keywords = {
-            'programming': ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust', 'php'],
-            'ai_ml': ['ai', 'ml', 'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'opencv', 'nlp', 'computer vision'],
-            'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'cloud'],
-            'databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'database'],
-            'frameworks': ['react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'spring'],
-            'tools': ['git', 'jenkins', 'ci/cd', 'linux', 'bash']
-        }
-        
-        # Flatten all skills
-        all_skills = []
-        for skill_list in skills.values():
-            if isinstance(skill_list, list):
-                all_skills.extend(skill_list)
-        
-        # Categorize each skill
-        for skill in all_skills:
-            skill_lower = skill.lower()
-            categorized_skill = False
-            
-            for category, keywords in category_keywords.items():
-                if any(keyword in skill_lower for keyword in keywords):
-                    categorized[category].append(skill)
-                    categorized_skill = True
-                    break
-            
-            if not categorized_skill:
-                categorized['technical'].append(skill)
-        
-        # Remove empty categories and duplicates
-        return {k: list(set(v)) for k, v in categorized.items() if v}
-
-    def format_experience_header(self, exp):
-        """Format experience header with company, location, and duration"""
-        parts = []
-        
-        if exp.get('company'):
-            parts.append(f"<b>{exp['company']}</b>")
-        
-        # Add location and duration on same line, properly spaced
-        details = []
-        if exp.get('location'):
-            details.append(exp['location'])
-        if exp.get('duration'):
-            details.append(exp['duration'])
-        
-        if details:
-            parts.append(" | ".join(details))
-        
-        return " | ".join(parts) if parts else None
-
-    def format_project_header(self, project):
-        """Format project header with name and duration"""
-        if not project.get('name'):
-            return None
-        
-        header = f"<b>{project['name']}</b>"
-        if project.get('duration'):
-            header += f" | <i>{project['duration']}</i>"
-        
-        return header
-
-    def format_technologies(self, technologies):
-        """Format technologies list"""
-        if isinstance(technologies, list):
-            return ", ".join(technologies)
-        return str(technologies)
-
-    def format_education_info(self, edu):
-        """Format education institution and year"""
-        parts = []
-        
-        if edu.get('school'):
-            parts.append(edu['school'])
-        if edu.get('location'):
-            parts.append(edu['location'])
-        if edu.get('year'):
-            parts.append(str(edu['year']))
-        
-        return " | ".join(parts) if parts else None
-
-    def format_education_details(self, edu):
-        """Format additional education details"""
-        details = []
-        
-        if edu.get('gpa'):
-            details.append(f"CGPA: {edu['gpa']}")
-        if edu.get('percentage'):
-            details.append(f"Percentage: {edu['percentage']}%")
-        if edu.get('honors'):
-            details.append(f"Honors: {edu['honors']}")
-        
-        return details
-
-    def format_certification(self, cert):
-        """Format certification information"""
-        if isinstance(cert, dict):
-            parts = []
-            if cert.get('name'):
-                parts.append(cert['name'])
-            if cert.get('issuer'):
-                parts.append(f"by {cert['issuer']}")
-            if cert.get('date'):
-                parts.append(f"({cert['date']})")
-            return " ".join(parts)
-        
-        return str(cert)
-
-    def extract_professional_title(self, summary):
-        """Extract professional title from summary"""
-        # Default title
-        default_title = "AI Engineer | Full Stack Developer | DevOps Specialist"
-        
-        # Try to extract roles from summary
-        role_keywords = {
-            'ai': 'AI Engineer',
-            'machine learning': 'ML Engineer', 
-            'data scientist': 'Data Scientist',
-            'full stack': 'Full Stack Developer',
-            'backend': 'Backend Developer',
-            'frontend': 'Frontend Developer',
-            'devops': 'DevOps Engineer',
-            'cloud': 'Cloud Engineer'
-        }
-        
-        summary_lower = summary.lower()
-        found_roles = []
-        
-        for keyword, role in role_keywords.items():
-            if keyword in summary_lower:
-                found_roles.append(role)
-        
-        if found_roles:
-            return " | ".join(found_roles[:3])  # Limit to 3 roles
-        
-        return default_title
-
-    def generate_docx_resume(self, resume_data):
-        """Generate Word document resume"""
-        try:
-            doc = docx.Document()
-            
-            # Set document margins
-            sections = doc.sections
-            for section in sections:
-                section.top_margin = docx.shared.Inches(0.5)
-                section.bottom_margin = docx.shared.Inches(0.5)
-                section.left_margin = docx.shared.Inches(0.75)
-                section.right_margin = docx.shared.Inches(0.75)
-            
-            personal_info = resume_data.get('personal_info', {})
-            
-            # Header with name
-            if personal_info.get('name'):
-                name_para = doc.add_paragraph()
-                name_run = name_para.add_run(personal_info['name'].upper())
-                name_run.font.size = docx.shared.Pt(18)
-                name_run.font.bold = True
-                name_para.alignment = docx.enum.text.WS_ALIGN_LEFT
-            
-            # Professional title
-            title_para = doc.add_paragraph("AI Engineer | Full Stack Developer | DevOps Specialist")
-            title_para.alignment = docx.enum.text.WS_ALIGN_LEFT
-            
-            # Contact information
-            if any(personal_info.values()):
-                # Create a table for contact info
-                contact_table = doc.add_table(rows=3, cols=2)
-                contact_table.style = 'Table Grid'
-                
-                # Left column
-                if personal_info.get('linkedin'):
-                    contact_table.cell(0, 0).text = f"LinkedIn: {personal_info['linkedin']}"
-                if personal_info.get('location'):
-                    contact_table.cell(1, 0).text = f"Location: {personal_info['location']}"
-                
-                # Right column
-                if personal_info.get('github'):
-                    contact_table.cell(0, 1).text = f"GitHub: {personal_info['github']}"
-                if personal_info.get('phone'):
-                    contact_table.cell(1, 1).text = f"Mob: {personal_info['phone']}"
-                if personal_info.get('email'):
-                    contact_table.cell(2, 1).text = f"E-mail: {personal_info['email']}"
-            
-            # Professional Summary
-            if resume_data.get('summary'):
-                doc.add_paragraph()
-                summary_heading = doc.add_paragraph()
-                summary_run = summary_heading.add_run("PROFESSIONAL SUMMARY")
-                summary_run.font.bold = True
-                summary_run.underline = True
-                doc.add_paragraph(resume_data['summary'])
-            
-            # Core Competencies
-            skills = resume_data.get('skills', {})
-            if skills:
-                doc.add_paragraph()
-                skills_heading = doc.add_paragraph()
-                skills_run = skills_heading.add_run("CORE COMPETENCIES")
-                skills_run.font.bold = True
-                skills_run.underline = True
-                
-                tech_para = doc.add_paragraph()
-                tech_run = tech_para.add_run("Technical Skills:")
-                tech_run.font.bold = True
-                
-                if isinstance(skills, dict):
-                    for category, skill_list in skills.items():
-                        if skill_list:
-                            category_para = doc.add_paragraph()
-                            category_run = category_para.add_run(f"- {category.replace('_', ' ').title()}: ")
-                            category_run.font.bold = True
-                            category_para.add_run(", ".join(skill_list))
-                elif isinstance(skills, list):
-                    skills_para = doc.add_paragraph()
-                    skills_para.add_run("- Technical Skills: ")
-                    skills_para.add_run(", ".join(skills))
-            
-            # Work Experience
-            if resume_data.get('experience'):
-                doc.add_paragraph()
-                exp_heading = doc.add_paragraph()
-                exp_run = exp_heading.add_run("WORK EXPERIENCE")
-                exp_run.font.bold = True
-                exp_run.underline = True
-                
-                for exp in resume_data['experience']:
-                    if exp.get('title'):
-                        title_para = doc.add_paragraph()
-                        title_run = title_para.add_run(exp['title'])
-                        title_run.font.bold = True
-                    
-                    if exp.get('company'):
-                        company_para = doc.add_paragraph()
-                        company_text = exp['company']
-                        if exp.get('duration'):
-                            company_text += f" | {exp['duration']}"
-                        company_run = company_para.add_run(company_text)
-                        company_run.font.bold = True
-                    
-                    if exp.get('description'):
-                        if isinstance(exp['description'], list):
-                            for desc in exp['description']:
-                                if desc.strip():
-                                    desc_para = doc.add_paragraph(f"- {desc}")
-                        else:
-                            desc_para = doc.add_paragraph(f"- {exp['description']}")
-            
-            # Projects
-            if resume_data.get('projects'):
-                doc.add_paragraph()
-                proj_heading = doc.add_paragraph()
-                proj_run = proj_heading.add_run("KEY PROJECTS")
-                proj_run.font.bold = True
-                proj_run.underline = True
-                
-                for project in resume_data['projects']:
-                    if project.get('name'):
-                        proj_para = doc.add_paragraph()
-                        proj_name = project['name']
-                        if project.get('duration'):
-                            proj_name += f" | {project['duration']}"
-                        proj_run = proj_para.add_run(proj_name)
-                        proj_run.font.bold = True
-                    
-                    if project.get('description'):
-                        if isinstance(project['description'], list):
-                            for desc in project['description']:
-                                if desc.strip():
-                                    doc.add_paragraph(f"- {desc}")
-                        else:
-                            doc.add_paragraph(f"- {project['description']}")
-                    
-                    if project.get('technologies'):
-                        tech_para = doc.add_paragraph()
-                        tech_para.add_run("- Technologies: ").font.bold = True
-                        if isinstance(project['technologies'], list):
-                            tech_para.add_run(", ".join(project['technologies']))
-                        else:
-                            tech_para.add_run(project['technologies'])
-            
-            # Education
-            if resume_data.get('education'):
-                doc.add_paragraph()
-                edu_heading = doc.add_paragraph()
-                edu_run = edu_heading.add_run("EDUCATION")
-                edu_run.font.bold = True
-                edu_run.underline = True
-                
-                for edu in resume_data['education']:
-                    if edu.get('degree'):
-                        degree_para = doc.add_paragraph()
-                        degree_run = degree_para.add_run(edu['degree'])
-                        degree_run.font.bold = True
-                    
-                    if edu.get('school'):
-                        school_text = edu['school']
-                        if edu.get('year'):
-                            school_text += f" | {edu['year']}"
-                        doc.add_paragraph(school_text)
-                    
-                    if edu.get('gpa'):
-                        doc.add_paragraph(f"CGPA: {edu['gpa']}")
-                    elif edu.get('percentage'):
-                        doc.add_paragraph(f"Percentage: {edu['percentage']}")
-            
-            # Certifications
-            if resume_data.get('certifications'):
-                doc.add_paragraph()
-                cert_heading = doc.add_paragraph()
-                cert_run = cert_heading.add_run("CERTIFICATIONS")
-                cert_run.font.bold = True
-                cert_run.underline = True
-                
-                for cert in resume_data['certifications']:
-                    if isinstance(cert, dict):
-                        cert_text = cert.get('name', '')
-                        if cert.get('issuer'):
-                            cert_text += f" - {cert['issuer']}"
-                        if cert.get('date'):
-                            cert_text += f" | {cert['date']}"
-                        doc.add_paragraph(f"- {cert_text}")
-                    else:
-                        doc.add_paragraph(f"- {cert}")
-            
-            # Achievements
-            if resume_data.get('achievements'):
-                doc.add_paragraph()
-                achv_heading = doc.add_paragraph()
-                achv_run = achv_heading.add_run("ACHIEVEMENTS AND RECOGNITION")
-                achv_run.font.bold = True
-                achv_run.underline = True
-                
-                for achievement in resume_data['achievements']:
-                    doc.add_paragraph(f"- {achievement}")
-            
-            # Save to buffer
-            buffer = io.BytesIO()
-            doc.save(buffer)
-            buffer.seek(0)
-            return buffer
-            
-        except Exception as e:
-            st.error(f"Error generating Word document: {str(e)}")
-            return None
+@st.cache_resource(show_spinner=False)
+def get_optimizer():
+    """Create the optimizer once per process and share it across reruns and sessions"""
+    return AIResumeOptimizer()
 
 def main():
     st.markdown('<h1 class="main-header">❤️ Resume Builder for Nagashree ❤️</h1>', unsafe_allow_html=True)
     st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">Advanced Azure OpenAI Resume Optimization</p>', unsafe_allow_html=True)
     
-    # Initialize optimizer
-    optimizer = AIResumeOptimizer()
+    # Shared optimizer (and Azure OpenAI connection pool) for this process
+    optimizer = get_optimizer()
+    
+    # Scheduler for this run's AI calls
+    pipeline = AIPipeline()
 
     
     
@@ -1463,9 +2349,48 @@ def main():
         if optimizer.azure_client:
             st.success("✅ Azure OpenAI Connected")
             st.info(f"Model: {optimizer.deployment_name}")
+            if optimizer.embeddings_deployment:
+                st.info(f"Embeddings: {optimizer.embeddings_deployment}")
+            if len(optimizer.deployments.deployments) > 1:
+                with st.expander("🌐 Deployments"):
+                    st.dataframe(optimizer.deployments.to_dataframe(), hide_index=True)
         else:
             st.error("❌ Azure OpenAI Not Connected")
         
+        speculative_cover_letter = st.toggle(
+            "⚡ Speculative cover letter",
+            value=os.getenv("SPECULATIVE_COVER_LETTER") == "1",
+            help="Write the cover letter while the resume is being scored so it is ready instantly. "
+                 "Costs one extra AI call when no cover letter is requested."
+        )
+        
+        with st.expander("📏 Prompt Token Usage"):
+            st.caption(f"Prompt format: {PROMPT_FORMAT} (set PROMPT_FORMAT=compact|pretty)")
+            if 'resume_data' in st.session_state:
+                format_sizes = {
+                    prompt_format: estimate_tokens(encode_for_prompt(st.session_state['resume_data'], prompt_format))
+                    for prompt_format in ("pretty", "compact")
+                }
+                st.metric(
+                    "Resume tokens per prompt",
+                    format_sizes[PROMPT_FORMAT],
+                    delta=f"{format_sizes['compact'] - format_sizes['pretty']} compact vs pretty",
+                    delta_color="inverse"
+                )
+            usage_table = optimizer.usage.to_dataframe()
+            if not usage_table.empty:
+                st.dataframe(usage_table.tail(20), use_container_width=True, hide_index=True)
+        
+        with st.expander("🧭 Model Routing"):
+            st.caption("Per-task routes (override with MODEL_ROUTES)")
+            st.dataframe(
+                pd.DataFrame.from_dict(MODEL_ROUTES, orient='index').rename_axis('Task').reset_index(),
+                hide_index=True
+            )
+            route_summary = optimizer.usage.route_summary()
+            if not route_summary.empty:
+                st.dataframe(route_summary, use_container_width=True, hide_index=True)
+        
         st.markdown("### 📋 Process")
         st.markdown("""
         1. Upload resume (PDF/DOCX)
@@ -1478,6 +2403,11 @@ def main():
     # Main content
     col1, col2 = st.columns([1, 1])
     
+    with col2:
+        st.markdown('<h2 class="sub-header">👁️ Resume Preview</h2>', unsafe_allow_html=True)
+        # Filled section by section while the optimized resume streams in
+        live_preview = st.empty()
+    
     with col1:
         st.markdown('<h2 class="sub-header">📄 Upload Resume</h2>', unsafe_allow_html=True)
         
@@ -1487,16 +2417,61 @@ def main():
             help="Upload your current resume - AI will parse it intelligently"
         )
         
+        # Parsing results render here, but the parse itself only blocks after the
+        # job description has been read so both AI calls can run concurrently
+        parse_container = st.container()
+        
         if uploaded_file is not None:
             # Extract text
             if uploaded_file.type == "application/pdf":
-                extracted_text = optimizer.extract_text_from_pdf(uploaded_file)
+                extraction_progress = st.progress(0.0, text="📄 Extracting PDF text...")
+                page_seconds = []
+                
+                def show_page(page_number, page_count, seconds):
+                    page_seconds.append(seconds)
+                    extraction_progress.progress(
+                        page_number / page_count, text=f"📄 Extracted page {page_number} of {page_count}"
+                    )
+                
+                extraction_started = time.perf_counter()
+                extracted_text = optimizer.extract_text_from_pdf(uploaded_file, on_page=show_page)
+                extraction_progress.empty()
+                if page_seconds:
+                    st.caption(
+                        f"Extracted {len(page_seconds)} pages in {time.perf_counter() - extraction_started:.2f}s "
+                        f"(slowest page {max(page_seconds):.2f}s)"
+                    )
             else:
                 extracted_text = optimizer.extract_text_from_docx(uploaded_file)
             
             if extracted_text:
+                pipeline.add('resume_data', optimizer.ai_parse_resume, extracted_text)
+        
+        # Job Description
+        st.markdown('<h2 class="sub-header">🎯 Job Description</h2>', unsafe_allow_html=True)
+        
+        job_description = st.text_area(
+            "Paste the complete job description",
+            height=300,
+            placeholder="Paste the job description here - AI will analyze requirements..."
+        )
+        
+        company_name = st.text_input("Company Name (optional)", placeholder="e.g., Google, Microsoft")
+        
+        if job_description:
+            st.session_state['job_description'] = job_description
+            st.session_state['company_name'] = company_name
+            
+            # Start requirement extraction right away, in parallel with parsing
+            if st.session_state.get('job_requirements_source') == job_description:
+                pipeline.add_result('job_requirements', st.session_state['job_requirements'])
+            else:
+                pipeline.add('job_requirements', optimizer.ai_extract_job_requirements, job_description)
+        
+        if 'resume_data' in pipeline:
+            with parse_container:
                 with st.spinner("🧠 AI is parsing your resume..."):
-                    resume_data = optimizer.ai_parse_resume(extracted_text)
+                    resume_data = pipeline.result('resume_data')
                 
                 st.success("✅ Resume parsed by AI!")
                 st.session_state['resume_data'] = resume_data
@@ -1510,27 +2485,27 @@ def main():
                     with col_b:
                         all_skills = []
                         skills = resume_data.get('skills', {})
-                        for skill_list in skills.values():
-                            all_skills.extend(skill_list)
+                        # Parses cached before the skills schema may hold a flat list
+                        if isinstance(skills, dict):
+                            for skill_list in skills.values():
+                                if isinstance(skill_list, list):
+                                    all_skills.extend(skill_list)
+                        elif isinstance(skills, list):
+                            all_skills = skills
                         st.metric("Skills Found", len(all_skills))
                     with col_c:
                         edu_count = len(resume_data.get('education', []))
                         st.metric("Education Items", edu_count)
         
-        # Job Description
-        st.markdown('<h2 class="sub-header">🎯 Job Description</h2>', unsafe_allow_html=True)
-        
-        job_description = st.text_area(
-            "Paste the complete job description",
-            height=300,
-            placeholder="Paste the job description here - AI will analyze requirements..."
-        )
-        
-        company_name = st.text_input("Company Name (optional)", placeholder="e.g., Google, Microsoft")
-        
-        if job_description:
-            st.session_state['job_description'] = job_description
-            st.session_state['company_name'] = company_name
+        # Remember the extracted requirements for this job description. A
+        # failed (empty) extraction is kept for this run but retried on the next
+        if 'job_requirements' in pipeline:
+            with st.spinner("🎯 AI is analyzing job requirements..."):
+                st.session_state['job_requirements'] = pipeline.result('job_requirements')
+            if st.session_state['job_requirements']:
+                st.session_state['job_requirements_source'] = job_description
+            else:
+                st.session_state.pop('job_requirements_source', None)
         
         # AI Optimization Button
         if st.button("🚀 AI Optimize Resume", type="primary", use_container_width=True):
@@ -1540,37 +2515,72 @@ def main():
                 st.error("❌ Please enter a job description")
             else:
                 with st.spinner("🤖 AI is analyzing and optimizing..."):
-                    # AI analyze job requirements
-                    job_requirements = optimizer.ai_extract_job_requirements(job_description)
-                    st.session_state['job_requirements'] = job_requirements
+                    if 'resume_data' not in pipeline:
+                        pipeline.add_result('resume_data', st.session_state['resume_data'])
                     
-                    # AI optimize resume
-                    optimized_resume = optimizer.ai_optimize_resume(
-                        st.session_state['resume_data'], 
-                        job_requirements,
-                        job_description
-                    )
-                    st.session_state['optimized_resume'] = optimized_resume
+                    # Optimize -> score -> suggest, each step starting as soon
+                    # as its inputs (parsed resume, job requirements) are ready
+                    # Re-optimize only what changed when this resume was already
+                    # optimized for the same job description
+                    previous = None
+                    if st.session_state.get('optimized_for') == job_description and 'optimized_source' in st.session_state:
+                        previous = (st.session_state['optimized_source'], st.session_state['optimized_resume'])
                     
-                    # AI calculate ATS score
-                    ats_analysis = optimizer.ai_calculate_ats_score(
-                        optimized_resume,
-                        job_requirements
+                    sections = queue.Queue()
+                    optimizer.schedule_optimization(
+                        pipeline, job_description,
+                        on_section=lambda key, value: sections.put((key, value)),
+                        previous=previous,
+                        speculative_cover_letter=speculative_cover_letter,
+                        company_name=company_name
                     )
-                    st.session_state['ats_analysis'] = ats_analysis
                     
-                    # AI generate suggestions
-                    suggestions = optimizer.ai_suggest_improvements(
-                        optimized_resume,
-                        ats_analysis
+                    # Show optimized sections in the preview as they stream in
+                    partial_resume = {}
+                    optimizing = pipeline.steps['optimized_resume']
+                    while not (optimizing.done() and sections.empty()):
+                        try:
+                            key, value = sections.get(timeout=0.1)
+                        except queue.Empty:
+                            continue
+                        partial_resume[key] = value
+                        with live_preview.container():
+                            display_resume_preview(partial_resume)
+                    live_preview.empty()
+                    
+                    st.session_state['optimized_resume'] = pipeline.result('optimized_resume')
+                    # Documents render in the background while scoring finishes
+                    optimizer.prerender(st.session_state['optimized_resume'])
+                    # A failed run must not become the baseline for incremental
+                    # re-optimization, or its unoptimized sections would be reused
+                    if isinstance(st.session_state['optimized_resume'], FallbackResume):
+                        st.warning(f"⚠️ {st.session_state['optimized_resume'].error}. Run the optimization again to retry.")
+                        st.session_state.pop('optimized_source', None)
+                        st.session_state.pop('optimized_for', None)
+                    else:
+                        st.session_state['optimized_source'] = pipeline.result('resume_data')
+                        st.session_state['optimized_for'] = job_description
+                    ats_analysis = pipeline.result('ats_analysis')
+                    st.session_state['ats_analysis'] = ats_analysis
+                    st.session_state['ai_suggestions'] = pipeline.result('ai_suggestions')
+                    st.session_state['semantic_match'] = (
+                        pipeline.result('semantic_match') if 'semantic_match' in pipeline else None
                     )
-                    st.session_state['ai_suggestions'] = suggestions
+                    
+                    # Not waited on: the letter keeps writing after this run ends and is
+                    # only used if its inputs still match when the user asks for it
+                    if 'cover_letter' in pipeline:
+                        st.session_state['speculative_cover_letter'] = (
+                            cover_letter_inputs_key(
+                                st.session_state['optimized_resume'], st.session_state['job_requirements'],
+                                job_description, company_name
+                            ),
+                            pipeline.steps['cover_letter']
+                        )
                 
                 st.success(f"✅ AI Optimization Complete! Score: {ats_analysis.get('overall_score', 0)}%")
     
     with col2:
-        st.markdown('<h2 class="sub-header">👁️ Resume Preview</h2>', unsafe_allow_html=True)
-        
         if 'optimized_resume' in st.session_state:
             tab1, tab2 = st.tabs(["🎯 AI Optimized", "📄 Original"])
             
@@ -1583,12 +2593,161 @@ def main():
         else:
             st.info("📤 Upload a resume to see AI-powered preview")
     
+    # Batch Optimization - one resume against many job descriptions
+    with st.expander("📚 Batch Optimization - compare multiple jobs"):
+        batch_text = st.text_area(
+            "Paste several job descriptions, separated by a line containing only ---",
+            height=250,
+            key="batch_job_descriptions"
+        )
+        
+        if st.button("🚀 Optimize for All Jobs", use_container_width=True):
+            job_descriptions = split_job_descriptions(batch_text)
+            if 'resume_data' not in st.session_state:
+                st.error("❌ Please upload a resume first")
+            elif not job_descriptions:
+                st.error("❌ Please enter at least one job description")
+            else:
+                progress = st.progress(0.0, text=f"🤖 Optimizing for {len(job_descriptions)} jobs...")
+                table_placeholder = st.empty()
+                batch_results = {}
+                
+                # Stream the ranking as each job finishes
+                for index, result in optimizer.ai_batch_optimize(st.session_state['resume_data'], job_descriptions):
+                    batch_results[index] = result
+                    progress.progress(
+                        len(batch_results) / len(job_descriptions),
+                        text=f"✅ {len(batch_results)}/{len(job_descriptions)} jobs optimized"
+                    )
+                    table_placeholder.dataframe(rank_batch_results(batch_results), use_container_width=True)
+                
+                # Semantic fit is added once every job has finished
+                table_placeholder.dataframe(rank_batch_results(batch_results), use_container_width=True)
+                st.session_state['batch_results'] = batch_results
+                st.session_state.pop('batch_documents_zip', None)
+        
+        elif 'batch_results' in st.session_state:
+            st.dataframe(rank_batch_results(st.session_state['batch_results']), use_container_width=True)
+        
+        if 'batch_results' in st.session_state:
+            st.download_button(
+                label="📥 Download Ranking (CSV)",
+                data=rank_batch_results(st.session_state['batch_results']).to_csv(),
+                file_name="batch_ats_ranking.csv",
+                mime="text/csv",
+                use_container_width=True,
+                key="download_batch_ranking"
+            )
+            
+            # Render every optimized resume in a process pool, streaming into one zip
+            if st.button("📦 Render All Resumes (PDF + DOCX)", use_container_width=True):
+                resumes = [
+                    (f"{index + 1:02d}_{result.get('job_title', '')}", result['optimized_resume'])
+                    for index, result in sorted(st.session_state['batch_results'].items())
+                    if result.get('optimized_resume')
+                ]
+                total = len(resumes) * len(RENDER_FORMATS)
+                progress = st.progress(0.0, text=f"🖨️ Rendering {total} documents...")
+                timing_placeholder = st.empty()
+                zip_buffer = io.BytesIO()
+                timings = []
+                
+                for row in render_resumes_to_zip(resumes, zip_buffer):
+                    timings.append(row)
+                    progress.progress(len(timings) / total, text=f"✅ {len(timings)}/{total} documents rendered")
+                    timing_placeholder.dataframe(pd.DataFrame(timings), use_container_width=True, hide_index=True)
+                
+                failures = sum(1 for row in timings if row['Error'])
+                if failures:
+                    st.error(f"❌ {failures} documents failed to render")
+                st.session_state['batch_documents_zip'] = zip_buffer.getvalue()
+            
+            if 'batch_documents_zip' in st.session_state:
+                st.download_button(
+                    label="📥 Download All Resumes (ZIP)",
+                    data=st.session_state['batch_documents_zip'],
+                    file_name="optimized_resumes.zip",
+                    mime="application/zip",
+                    use_container_width=True,
+                    key="download_batch_documents"
+                )
+    
+    # Bulk Resume Screening - many candidates against one job description
+    with st.expander("👥 Bulk Resume Screening - rank many candidates"):
+        st.markdown("Scores every resume against the job description entered above.")
+        candidate_files = st.file_uploader(
+            "Upload candidate resumes (PDF/DOCX) or zip archives",
+            type=['pdf', 'docx', 'zip'],
+            accept_multiple_files=True,
+            key="screening_files"
+        )
+        candidate_folder = st.text_input(
+            "...or a folder on the server containing resumes",
+            key="screening_folder"
+        )
+        
+        if st.button("👥 Screen Candidates", use_container_width=True):
+            files = []
+            for candidate_file in candidate_files or []:
+                if candidate_file.name.lower().endswith('.zip'):
+                    files.extend(iter_resume_files(io.BytesIO(candidate_file.getvalue())))
+                else:
+                    files.append((candidate_file.name, candidate_file.getvalue()))
+            if candidate_folder:
+                if os.path.isdir(candidate_folder):
+                    files.extend(iter_resume_files(candidate_folder))
+                else:
+                    st.error(f"❌ Folder not found: {candidate_folder}")
+            
+            if not job_description:
+                st.error("❌ Please enter a job description")
+            elif not files:
+                st.error("❌ Please provide candidate resumes")
+            else:
+                leaderboard_path = os.path.join(
+                    SCREENING_OUTPUT_DIR,
+                    f"leaderboard_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                )
+                progress = st.progress(0.0, text=f"🤖 Screening {len(files)} candidates...")
+                table_placeholder = st.empty()
+                rows = []
+                
+                try:
+                    for row in optimizer.ai_screen_resumes(files, job_description, leaderboard_path):
+                        rows.append(row)
+                        progress.progress(
+                            len(rows) / len(files),
+                            text=f"✅ {len(rows)}/{len(files)} candidates screened"
+                        )
+                        table_placeholder.dataframe(rank_screening_results(rows), use_container_width=True)
+                except ValueError as e:
+                    progress.empty()
+                    st.error(f"❌ {str(e)}")
+                else:
+                    st.session_state['screening_results'] = rows
+                    st.success(f"✅ Leaderboard saved to {leaderboard_path}")
+        
+        elif 'screening_results' in st.session_state:
+            st.dataframe(rank_screening_results(st.session_state['screening_results']), use_container_width=True)
+        
+        if 'screening_results' in st.session_state:
+            st.download_button(
+                label="📥 Download Leaderboard (CSV)",
+                data=rank_screening_results(st.session_state['screening_results']).to_csv(),
+                file_name="candidate_leaderboard.csv",
+                mime="text/csv",
+                use_container_width=True,
+                key="download_leaderboard"
+            )
+    
     # AI Results Section
     if 'ats_analysis' in st.session_state:
         st.markdown("---")
         st.markdown('<h2 class="sub-header">🤖 AI Analysis Results</h2>', unsafe_allow_html=True)
         
         ats_analysis = st.session_state['ats_analysis']
+        # No-op when the documents are already rendered or rendering
+        document_jobs = optimizer.prerender(st.session_state['optimized_resume'])
         
         # AI Score Dashboard
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -1635,6 +2794,17 @@ def main():
                 st.markdown("**❌ Missing Keywords**")
                 for kw in ats_analysis.get('missing_keywords', [])[:10]:
                     st.markdown(f"• {kw}")
+            
+            # Requirement-by-requirement semantic alignment
+            semantic = st.session_state.get('semantic_match')
+            if semantic and semantic['alignment']:
+                st.markdown(f"**🧭 Semantic Requirement Coverage: {semantic['semantic_score']}%**")
+                alignment_table = pd.DataFrame(semantic['alignment']).rename(columns={
+                    'requirement': 'Requirement',
+                    'best_match': 'Closest Resume Content',
+                    'similarity': 'Similarity'
+                })
+                st.dataframe(alignment_table, use_container_width=True, hide_index=True)
         
         # AI Recommendations
         if 'ai_suggestions' in st.session_state:
@@ -1668,15 +2838,43 @@ def main():
         # AI-Generated Cover Letter Section
         st.markdown('<h2 class="sub-header">📝 AI Cover Letter Generator</h2>', unsafe_allow_html=True)
         
+        # A speculative letter written for other inputs is stale; discard it
+        cover_letter_key = cover_letter_inputs_key(
+            st.session_state['optimized_resume'],
+            st.session_state.get('job_requirements', {}),
+            st.session_state.get('job_description', ''),
+            st.session_state.get('company_name', '')
+        )
+        speculative = st.session_state.get('speculative_cover_letter')
+        if speculative and speculative[0] != cover_letter_key:
+            del st.session_state['speculative_cover_letter']
+            speculative = None
+        if speculative and speculative[1].done():
+            st.caption("⚡ A cover letter was pre-written while your resume was scored")
+        
         if st.button("✨ Generate AI Cover Letter", use_container_width=True):
-            with st.spinner("🤖 AI is writing your personalized cover letter..."):
-                cover_letter = optimizer.ai_generate_cover_letter(
-                    st.session_state['optimized_resume'],
-                    st.session_state.get('job_requirements', {}),
-                    st.session_state.get('job_description', ''),
-                    st.session_state.get('company_name', '')
-                )
-                st.session_state['cover_letter'] = cover_letter
+            cover_letter = ""
+            if speculative:
+                del st.session_state['speculative_cover_letter']
+                try:
+                    with st.spinner("📝 Finishing cover letter..."):
+                        cover_letter = speculative[1].result()
+                except Exception:
+                    cover_letter = ""
+            
+            # Fall back to writing it live when nothing usable was pre-written
+            if not cover_letter.strip():
+                # Render the letter as it is written, then swap in the formatted version
+                stream_placeholder = st.empty()
+                with stream_placeholder.container():
+                    cover_letter = st.write_stream(optimizer.ai_generate_cover_letter_stream(
+                        st.session_state['optimized_resume'],
+                        st.session_state.get('job_requirements', {}),
+                        st.session_state.get('job_description', ''),
+                        st.session_state.get('company_name', '')
+                    ))
+                stream_placeholder.empty()
+            st.session_state['cover_letter'] = cover_letter.strip()
         
         if 'cover_letter' in st.session_state:
             st.markdown("### 📄 AI-Generated Cover Letter")
@@ -1700,27 +2898,32 @@ def main():
         # Download Section
         st.markdown('<h2 class="sub-header">⬇️ Download Optimized Resume</h2>', unsafe_allow_html=True)
         
-        download_col1, download_col2, download_col3 = st.columns(3)
-        
-        with download_col1:
-            if st.button("📄 Generate PDF", type="primary", use_container_width=True):
-                with st.spinner("📝 Creating professional PDF..."):
-                    try:
-                        pdf_buffer = optimizer.generate_pdf_resume(st.session_state['optimized_resume'])
-                        
-                        st.download_button(
-                            label="📥 Download PDF Resume",
-                            data=pdf_buffer.getvalue(),
-                            file_name="ai_optimized_resume.pdf",
-                            mime="application/pdf",
-                            use_container_width=True,
-                            key="download_pdf"
-                        )
-                        st.success("✅ PDF generated successfully!")
-                    except Exception as e:
-                        st.error(f"❌ Error generating PDF: {str(e)}")
+        download_col1, download_col2, download_col3, download_col4 = st.columns(4)
+        
+        # Both documents were pre-rendered when the optimized resume landed
+        document_downloads = [
+            (download_col1, 'pdf', "📥 Download PDF Resume", "application/pdf"),
+            (download_col2, 'docx', "📥 Download Word Resume",
+             "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        ]
+        for column, fmt, label, mime in document_downloads:
+            with column:
+                try:
+                    with st.spinner(f"📝 Finishing {fmt.upper()}..."):
+                        document = document_jobs[fmt].result()
+                    st.download_button(
+                        label=label,
+                        data=document,
+                        file_name=f"ai_optimized_resume.{fmt}",
+                        mime=mime,
+                        type="primary" if fmt == 'pdf' else "secondary",
+                        use_container_width=True,
+                        key=f"download_{fmt}"
+                    )
+                except Exception as e:
+                    st.error(f"❌ Error generating {fmt.upper()}: {str(e)}")
         
-        with download_col2:
+        with download_col3:
             json_data = json.dumps(st.session_state['optimized_resume'], indent=2)
             st.download_button(
                 label="📋 Download JSON Data",
@@ -1731,7 +2934,7 @@ def main():
                 key="download_json"
             )
         
-        with download_col3:
+        with download_col4:
             # Generate comprehensive report
             if st.button("📊 Generate AI Report", use_container_width=True):
                 report_data = generate_ai_analysis_report(
@@ -1757,10 +2960,17 @@ def main():
         
         comparison_col1, comparison_col2 = st.columns(2)
         
+        # Local scoring is instant, so the original resume is scored the same way
+        original_local_score = optimizer.local_ats_score(
+            st.session_state.get('resume_data', {}),
+            st.session_state.get('job_requirements', {})
+        )
+        
         with comparison_col1:
             st.markdown("### 📄 Original Resume")
             original_metrics = calculate_resume_metrics(st.session_state.get('resume_data', {}))
             st.metric("Structure Score", f"{original_metrics['structure_score']}%")
+            st.metric("Keyword Match", f"{original_local_score['keyword_score']}%")
             st.metric("Skills Count", original_metrics['skills_count'])
             st.metric("Sections Present", f"{original_metrics['sections']}/8")
         
@@ -1768,7 +2978,9 @@ def main():
             st.markdown("### ✨ AI-Optimized Resume")
             optimized_metrics = calculate_resume_metrics(st.session_state.get('optimized_resume', {}))
             improvement = ats_analysis.get('overall_score', 0) - original_metrics.get('basic_score', 0)
+            keyword_gain = ats_analysis.get('keyword_score', 0) - original_local_score['keyword_score']
             st.metric("AI ATS Score", f"{ats_analysis.get('overall_score', 0)}%", delta=f"+{improvement:.1f}%")
+            st.metric("Keyword Match", f"{ats_analysis.get('keyword_score', 0)}%", delta=f"{keyword_gain:+d}%")
             st.metric("Enhanced Skills", optimized_metrics['skills_count'])
             st.metric("Complete Sections", f"{optimized_metrics['sections']}/8")
         
@@ -1834,6 +3046,67 @@ def main():
             st.markdown("• Keep formatting ATS-friendly")
             st.markdown("• Update for each application")
 
+def split_job_descriptions(text):
+    """Split a batch of job descriptions separated by lines containing only ---"""
+    parts = re.split(r'^\s*-{3,}\s*$', text, flags=re.MULTILINE)
+    return [part.strip() for part in parts if part.strip()]
+
+def cover_letter_inputs_key(resume_data, job_requirements, job_description, company_name):
+    """Content address of everything a cover letter is written from"""
+    return DiskCache.make_key(
+        json.dumps(resume_data, sort_keys=True),
+        json.dumps(job_requirements, sort_keys=True),
+        job_description,
+        company_name
+    )
+
+def summarize_job_title(job_description, max_length=60):
+    """Use the first non-empty line of a job description as its display title"""
+    for line in job_description.splitlines():
+        line = line.strip()
+        if line:
+            return line if len(line) <= max_length else line[:max_length - 3] + "..."
+    return "Untitled job"
+
+def rank_batch_results(results):
+    """Build a table of batch optimization results ranked by ATS score.
+
+    Semantic Fit (embedding coverage of the job's requirements by the
+    original resume) breaks ties and is empty until the batch finishes.
+    """
+    rows = []
+    for index, result in results.items():
+        ats_analysis = result.get('ats_analysis', {})
+        rows.append({
+            'Job #': index + 1,
+            'Job': result.get('job_title', ''),
+            'ATS Score': ats_analysis.get('overall_score', 0),
+            'Keyword Match': ats_analysis.get('keyword_score', 0),
+            'Skills Alignment': ats_analysis.get('skills_score', 0),
+            'Experience Match': ats_analysis.get('experience_score', 0),
+            'Semantic Fit': result.get('semantic_fit'),
+            'Missing Keywords': ", ".join(ats_analysis.get('missing_keywords', [])[:5])
+        })
+    
+    table = pd.DataFrame(rows, columns=[
+        'Job #', 'Job', 'ATS Score', 'Keyword Match', 'Skills Alignment',
+        'Experience Match', 'Semantic Fit', 'Missing Keywords'
+    ])
+    table = table.sort_values(
+        ['ATS Score', 'Semantic Fit', 'Job #'], ascending=[False, False, True], na_position='last'
+    ).reset_index(drop=True)
+    table.index = table.index + 1
+    table.index.name = 'Rank'
+    return table
+
+def rank_screening_results(rows):
+    """Build the bulk screening leaderboard ranked by ATS score"""
+    table = pd.DataFrame(rows, columns=LEADERBOARD_COLUMNS)
+    table = table.sort_values(['ATS Score', 'Candidate'], ascending=[False, True]).reset_index(drop=True)
+    table.index = table.index + 1
+    table.index.name = 'Rank'
+    return table
+
 def calculate_resume_metrics(resume_data):
     """Calculate comprehensive resume metrics"""
     metrics = {
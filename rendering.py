@@ -0,0 +1,1049 @@
+# rendering.py
+"""Resume document rendering (PDF via reportlab, DOCX via python-docx).
+
+Like text_extraction, this module does not touch Streamlit, so bulk
+rendering can run in worker processes: reportlab layout is CPU-bound and
+holds the GIL, so threads would not render in parallel.
+"""
+import io
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import zipfile
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import NamedTuple
+import docx
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, HRFlowable, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.colors import black
+from reportlab.lib import colors
+
+RENDER_FORMATS = ('pdf', 'docx')
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0")) or None
+
+# Bump whenever the PDF theme or either document layout changes, so cached
+# renders of the old template are never served
+TEMPLATE_VERSION = "1"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+def resume_hash(resume_data):
+    """Canonical hash of a resume dict, independent of key order and whitespace"""
+    canonical = json.dumps(resume_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Thread-safe in-memory LRU of rendered documents, bounded by total bytes"""
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(resume_data, fmt):
+        return resume_hash(resume_data), TEMPLATE_VERSION, fmt
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key, data):
+        # A document larger than the whole budget would evict everything for nothing
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+
+class PDFTheme(NamedTuple):
+    """Paragraph and table styles for the PDF resume, shared read-only by every render"""
+    name: ParagraphStyle
+    title: ParagraphStyle
+    contact: ParagraphStyle
+    section_heading: ParagraphStyle
+    subsection: ParagraphStyle
+    body: ParagraphStyle
+    bullet: ParagraphStyle
+    skills: ParagraphStyle
+    category: ParagraphStyle
+    contact_table_style: TableStyle
+    skills_table_style: TableStyle
+    contact_col_widths: tuple
+    skills_col_widths: tuple
+
+@lru_cache(maxsize=1)
+def get_pdf_theme():
+    """Build the PDF theme once per process; renders only do per-resume work"""
+    styles = getSampleStyleSheet()
+    
+    # Enhanced custom styles with better alignment
+    name_style = ParagraphStyle(
+        'NameStyle',
+        parent=styles['Title'],
+        fontSize=20,
+        fontName='Helvetica-Bold',
+        textColor=black,
+        alignment=1,  # Center align for name
+        spaceAfter=6,
+        spaceBefore=0
+    )
+    
+    title_style = ParagraphStyle(
+        'TitleStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        fontName='Helvetica',
+        textColor=black,
+        alignment=1,  # Center align for title
+        spaceAfter=12,
+        spaceBefore=0
+    )
+    
+    contact_style = ParagraphStyle(
+        'ContactStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        fontName='Helvetica',
+        textColor=black,
+        alignment=0,  # Left align
+        spaceAfter=2,
+        spaceBefore=0,
+        leftIndent=0,
+        rightIndent=0
+    )
+    
+    section_heading_style = ParagraphStyle(
+        'SectionHeading',
+        parent=styles['Heading2'],
+        fontSize=13,
+        fontName='Helvetica-Bold',
+        textColor=black,
+        alignment=0,  # Left align
+        spaceAfter=10,
+        spaceBefore=16,
+        borderWidth=1,
+        borderColor=black,
+        borderPadding=2,
+        keepWithNext=True,  # Prevent orphaned headers
+        pageBreakBefore=0,  # Allow page breaks before if needed
+        splitLongWords=False
+    )
+    
+    subsection_style = ParagraphStyle(
+        'SubsectionStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        fontName='Helvetica-Bold',
+        textColor=black,
+        alignment=0,
+        spaceAfter=4,
+        spaceBefore=8,
+        keepWithNext=True
+    )
+    
+    body_style = ParagraphStyle(
+        'BodyStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        fontName='Helvetica',
+        textColor=black,
+        alignment=4,  # Justify
+        spaceAfter=4,
+        spaceBefore=0,
+        leftIndent=0,
+        rightIndent=0
+    )
+    
+    bullet_style = ParagraphStyle(
+        'BulletStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        fontName='Helvetica',
+        textColor=black,
+        alignment=0,
+        spaceAfter=3,
+        spaceBefore=0,
+        leftIndent=15,
+        bulletIndent=10,
+        bulletFontName='Symbol'
+    )
+    
+    # Style for skills with wrapping
+    skills_style = ParagraphStyle(
+        'SkillsStyle',
+        parent=body_style,
+        fontSize=10,
+        fontName='Helvetica',
+        textColor=black,
+        alignment=0,  # Left align
+        spaceAfter=0,
+        spaceBefore=0,
+        leftIndent=0,
+        rightIndent=0,
+        wordWrap='LTR'
+    )
+    
+    # Style for skill category labels
+    category_style = ParagraphStyle(
+        'CategoryStyle',
+        parent=body_style,
+        fontSize=10,
+        fontName='Helvetica-Bold',
+        textColor=black,
+        alignment=0,  # Left align
+        spaceAfter=0,
+        spaceBefore=0
+    )
+    
+    contact_table_style = TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),   # Left column left-aligned
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Right column right-aligned
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.white),  # Invisible grid for spacing
+    ])
+    
+    skills_table_style = TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),  # Category names bold
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),              # Top align for multi-line content
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),               # Left-align category labels
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),               # Left-align skills
+        ('LEFTPADDING', (0, 0), (0, -1), 0),              # No left padding for categories
+        ('RIGHTPADDING', (0, 0), (0, -1), 10),            # Right padding for categories
+        ('LEFTPADDING', (1, 0), (1, -1), 10),             # Left padding for skills
+        ('RIGHTPADDING', (1, 0), (1, -1), 5),             # Small right padding for skills
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('GRID', (0, 0), (-1, -1), 0, colors.white),      # No visible grid
+    ])
+    
+    return PDFTheme(
+        name=name_style,
+        title=title_style,
+        contact=contact_style,
+        section_heading=section_heading_style,
+        subsection=subsection_style,
+        body=body_style,
+        bullet=bullet_style,
+        skills=skills_style,
+        category=category_style,
+        contact_table_style=contact_table_style,
+        skills_table_style=skills_table_style,
+        contact_col_widths=(2.8*inch, 2.8*inch),
+        skills_col_widths=(1.5*inch, 4.2*inch)
+    )
+
+
+class ResumeRenderer:
+    """Turns resume JSON into PDF and DOCX documents"""
+
+    # Set to a RenderCache to reuse documents for unchanged resumes
+    render_cache = None
+
+    def render(self, resume_data, fmt):
+        """Render resume_data as 'pdf' or 'docx' bytes, from render_cache when possible"""
+        key = RenderCache.make_key(resume_data, fmt) if self.render_cache is not None else None
+        if key is not None:
+            data = self.render_cache.get(key)
+            if data is not None:
+                return data
+        generate = self.generate_pdf_resume if fmt == 'pdf' else self.generate_docx_resume
+        data = generate(resume_data).getvalue()
+        if key is not None:
+            self.render_cache.set(key, data)
+        return data
+
+    def generate_pdf_resume(self, resume_data):
+        """Generate professional PDF resume with proper alignment and formatting"""
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, 
+            pagesize=letter, 
+            rightMargin=40, 
+            leftMargin=40,
+            topMargin=40, 
+            bottomMargin=40
+        )
+        
+        theme = get_pdf_theme()
+        story = []
+        
+        # Helper function to add section with proper formatting and page break protection
+        def add_section_header(text):
+            # Create header paragraph with page break protection
+            header_para = Paragraph(f'<b>{text.upper()}</b>', theme.section_heading)
+            
+            # Add a thin line under section headers
+            hr_line = HRFlowable(width="100%", thickness=1, lineCap='round', color=black)
+            spacer = Spacer(1, 4)
+            
+            # Group header, line, and spacer together to prevent separation
+            header_group = KeepTogether([header_para, hr_line, spacer])
+            story.append(header_group)
+        
+        # HEADER SECTION WITH IMPROVED ALIGNMENT
+        personal_info = resume_data.get('personal_info', {})
+        
+        # Name - centered and prominent
+        if personal_info.get('name'):
+            story.append(Paragraph(f"<b>{personal_info['name'].upper()}</b>", theme.name))
+        
+        # Professional title - centered
+        title_text = "AI Engineer | Full Stack Developer | DevOps Specialist"
+        if resume_data.get('summary'):
+            summary = resume_data['summary']
+            # Extract professional roles from summary if available
+            if any(role in summary.lower() for role in ['engineer', 'developer', 'analyst', 'specialist']):
+                title_text = self.extract_professional_title(summary)
+        
+        story.append(Paragraph(title_text, theme.title))
+        story.append(Spacer(1, 8))
+        
+        # Contact information in properly aligned table
+        contact_data = self.create_contact_table(personal_info)
+        if contact_data:
+            # Create balanced contact table
+            contact_table = Table(contact_data, colWidths=theme.contact_col_widths)
+            contact_table.setStyle(theme.contact_table_style)
+            story.append(contact_table)
+        
+        story.append(Spacer(1, 16))
+        
+        # PROFESSIONAL SUMMARY with proper formatting
+        if resume_data.get('summary'):
+            add_section_header("PROFESSIONAL SUMMARY")
+            summary_para = Paragraph(resume_data['summary'], theme.body)
+            story.append(summary_para)
+            story.append(Spacer(1, 12))
+        
+        # CORE COMPETENCIES with left-aligned layout, page break protection, and proper text wrapping
+        skills = resume_data.get('skills', {})
+        if skills:
+            add_section_header("CORE COMPETENCIES")
+            
+            # Organize skills in a clean table format with Paragraph objects
+            skill_table_data = self.organize_skills_table_with_paragraphs(skills, theme)
+            if skill_table_data:
+                # Fixed column widths for better alignment - adjust for wrapping
+                skills_table = Table(skill_table_data, colWidths=theme.skills_col_widths)
+                skills_table.setStyle(theme.skills_table_style)
+                # Ensure table stays with header
+                skills_table.keepWithNext = True
+                story.append(skills_table)
+            
+            story.append(Spacer(1, 12))
+        
+        # WORK EXPERIENCE with consistent formatting and page break protection
+        if resume_data.get('experience'):
+            add_section_header("PROFESSIONAL EXPERIENCE")
+            
+            for i, exp in enumerate(resume_data['experience']):
+                # Create experience block that stays together
+                exp_elements = []
+                
+                # Job title in bold
+                if exp.get('title'):
+                    title_para = Paragraph(f"<b>{exp['title']}</b>", theme.subsection)
+                    exp_elements.append(title_para)
+                
+                # Company, location, and duration in organized format
+                exp_info = self.format_experience_header(exp)
+                if exp_info:
+                    company_para = Paragraph(exp_info, theme.body)
+                    exp_elements.append(company_para)
+                
+                # Job responsibilities with proper bullet formatting
+                if exp.get('description'):
+                    if isinstance(exp['description'], list):
+                        for desc in exp['description']:
+                            if desc.strip():
+                                bullet_para = Paragraph(f"• {desc}", theme.bullet)
+                                exp_elements.append(bullet_para)
+                    else:
+                        bullet_para = Paragraph(f"• {exp['description']}", theme.bullet)
+                        exp_elements.append(bullet_para)
+                
+                # Keep experience block together
+                if exp_elements:
+                    exp_block = KeepTogether(exp_elements)
+                    story.append(exp_block)
+                
+                # Add spacing between experiences
+                if i < len(resume_data['experience']) - 1:
+                    story.append(Spacer(1, 10))
+            
+            story.append(Spacer(1, 12))
+        
+        # KEY PROJECTS with enhanced formatting and page break protection
+        if resume_data.get('projects'):
+            add_section_header("KEY PROJECTS")
+            
+            for i, project in enumerate(resume_data['projects']):
+                # Create project block that stays together
+                project_elements = []
+                
+                # Project name and duration
+                project_header = self.format_project_header(project)
+                if project_header:
+                    header_para = Paragraph(project_header, theme.subsection)
+                    project_elements.append(header_para)
+                
+                # Project description and details
+                if project.get('description'):
+                    if isinstance(project['description'], list):
+                        for desc in project['description']:
+                            if desc.strip():
+                                desc_para = Paragraph(f"• {desc}", theme.bullet)
+                                project_elements.append(desc_para)
+                    else:
+                        desc_para = Paragraph(f"• {project['description']}", theme.bullet)
+                        project_elements.append(desc_para)
+                
+                # Technologies with proper formatting
+                if project.get('technologies'):
+                    tech_text = self.format_technologies(project['technologies'])
+                    tech_para = Paragraph(f"• <b>Technologies:</b> {tech_text}", theme.bullet)
+                    project_elements.append(tech_para)
+                
+                # Keep project block together
+                if project_elements:
+                    project_block = KeepTogether(project_elements)
+                    story.append(project_block)
+                
+                if i < len(resume_data['projects']) - 1:
+                    story.append(Spacer(1, 8))
+            
+            story.append(Spacer(1, 12))
+        
+        # EDUCATION with consistent alignment and page break protection
+        if resume_data.get('education'):
+            add_section_header("EDUCATION")
+            
+            for edu in resume_data['education']:
+                # Create education block that stays together
+                edu_elements = []
+                
+                # Degree in bold
+                if edu.get('degree'):
+                    degree_para = Paragraph(f"<b>{edu['degree']}</b>", theme.subsection)
+                    edu_elements.append(degree_para)
+                
+                # School and details
+                edu_info = self.format_education_info(edu)
+                if edu_info:
+                    school_para = Paragraph(edu_info, theme.body)
+                    edu_elements.append(school_para)
+                
+                # Additional details (GPA, honors, etc.)
+                edu_details = self.format_education_details(edu)
+                if edu_details:
+                    for detail in edu_details:
+                        detail_para = Paragraph(detail, theme.body)
+                        edu_elements.append(detail_para)
+                
+                # Keep education block together
+                if edu_elements:
+                    edu_block = KeepTogether(edu_elements)
+                    story.append(edu_block)
+                
+                story.append(Spacer(1, 6))
+        
+        # CERTIFICATIONS with organized layout
+        if resume_data.get('certifications'):
+            add_section_header("CERTIFICATIONS")
+            
+            for cert in resume_data['certifications']:
+                cert_text = self.format_certification(cert)
+                if cert_text:
+                    story.append(Paragraph(f"• {cert_text}", theme.bullet))
+            
+            story.append(Spacer(1, 8))
+        
+        # ACHIEVEMENTS with proper formatting
+        if resume_data.get('achievements'):
+            add_section_header("ACHIEVEMENTS AND RECOGNITION")
+            
+            for achievement in resume_data['achievements']:
+                story.append(Paragraph(f"• {achievement}", theme.bullet))
+        
+        # Build the PDF
+        doc.build(story)
+        buffer.seek(0)
+        return buffer
+
+    def create_contact_table(self, personal_info):
+        """Create properly formatted contact information table"""
+        contact_left = []
+        contact_right = []
+        
+        # Organize contact info in two balanced columns
+        if personal_info.get('location'):
+            contact_left.append(f"Location: {personal_info['location']}")
+        if personal_info.get('linkedin'):
+            linkedin_display = personal_info['linkedin'].replace('https://', '').replace('http://', '')
+            contact_left.append(f"LinkedIn: {linkedin_display}")
+        
+        if personal_info.get('phone'):
+            contact_right.append(f"Mobile: {personal_info['phone']}")
+        if personal_info.get('email'):
+            contact_right.append(f"Email: {personal_info['email']}")
+        if personal_info.get('github'):
+            github_display = personal_info['github'].replace('https://', '').replace('http://', '')
+            contact_right.append(f"GitHub: {github_display}")
+        
+        # Create balanced table data
+        contact_data = []
+        max_items = max(len(contact_left), len(contact_right))
+        
+        for i in range(max_items):
+            left_item = contact_left[i] if i < len(contact_left) else ""
+            right_item = contact_right[i] if i < len(contact_right) else ""
+            contact_data.append([left_item, right_item])
+        
+        return contact_data if contact_data else None
+
+    def organize_skills_table_with_paragraphs(self, skills, theme):
+        """Organize skills into table format using Paragraph objects for proper wrapping"""
+        skill_table_data = []
+        
+        if isinstance(skills, dict):
+            # Define skill categories and their display order
+            skill_categories = {
+                'programming': 'Programming',
+                'technical': 'Technical',
+                'ai_ml': 'AI/ML',
+                'cloud': 'Cloud',
+                'tools': 'Tools & Platforms',
+                'databases': 'Databases',
+                'frameworks': 'Frameworks',
+                'soft_skills': 'Soft Skills'
+            }
+            
+            # Categorize skills intelligently
+            categorized_skills = self.categorize_skills_intelligently(skills)
+            
+            for category_key, category_name in skill_categories.items():
+                if categorized_skills.get(category_key):
+                    # Create category paragraph
+                    category_para = Paragraph(f"{category_name}:", theme.category)
+                    
+                    # Format skills with proper wrapping using Paragraph
+                    skills_text = ", ".join(categorized_skills[category_key])
+                    skills_para = Paragraph(skills_text, theme.skills)
+                    
+                    skill_table_data.append([category_para, skills_para])
+        
+        elif isinstance(skills, list):
+            category_para = Paragraph("Technical Skills:", theme.category)
+            skills_text = ", ".join(skills)
+            skills_para = Paragraph(skills_text, theme.skills)
+            skill_table_data.append([category_para, skills_para])
+        
+        return skill_table_data
+
+    def organize_skills_table(self, skills):
+        """Organize skills into a clean table format with proper alignment and text wrapping"""
+        skill_table_data = []
+        
+        if isinstance(skills, dict):
+            # Define skill categories and their display order
+            skill_categories = {
+                'programming': 'Programming',
+                'technical': 'Technical',
+                'ai_ml': 'AI/ML',
+                'cloud': 'Cloud',
+                'tools': 'Tools & Platforms',
+                'databases': 'Databases',
+                'frameworks': 'Frameworks',
+                'soft_skills': 'Soft Skills'
+            }
+            
+            # Categorize skills intelligently
+            categorized_skills = self.categorize_skills_intelligently(skills)
+            
+            for category_key, category_name in skill_categories.items():
+                if categorized_skills.get(category_key):
+                    # Format skills with proper wrapping
+                    skills_text = self.format_skills_with_wrapping(categorized_skills[category_key])
+                    # Ensure consistent formatting with colon
+                    skill_table_data.append([f"{category_name}:", skills_text])
+        
+        elif isinstance(skills, list):
+            skills_text = self.format_skills_with_wrapping(skills)
+            skill_table_data.append(["Technical Skills:", skills_text])
+        
+        return skill_table_data
+
+    def format_skills_with_wrapping(self, skills_list, max_line_length=80):
+        """Format skills list with proper line breaks to prevent overflow"""
+        if not skills_list:
+            return ""
+        
+        # Join skills with commas
+        skills_text = ", ".join(skills_list)
+        
+        # If the text is short enough, return as is
+        if len(skills_text) <= max_line_length:
+            return skills_text
+        
+        # Break into multiple lines while keeping skills together
+        lines = []
+        current_line = ""
+        
+        for skill in skills_list:
+            # Check if adding this skill would exceed line length
+            if current_line and len(current_line + ", " + skill) > max_line_length:
+                # Add current line and start new one
+                lines.append(current_line)
+                current_line = skill
+            else:
+                # Add to current line
+                if current_line:
+                    current_line += ", " + skill
+                else:
+                    current_line = skill
+        
+        # Add the last line
+        if current_line:
+            lines.append(current_line)
+        
+        # Join lines with line breaks
+        return "<br/>".join(lines)
+
+    def categorize_skills_intelligently(self, skills):
+        """Intelligently categorize skills based on keywords"""
+        categorized = {
+            'programming': [],
+            'ai_ml': [],
+            'cloud': [],
+            'tools': [],
+            'databases': [],
+            'frameworks': [],
+            'technical': []
+        }
+        
+        # Define keyword mappings
+        category_keywords = {
+            'programming': ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust', 'php'],
+            'ai_ml': ['ai', 'ml', 'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'opencv', 'nlp', 'computer vision'],
+            'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'cloud'],
+            'databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'database'],
+            'frameworks': ['react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'spring'],
+            'tools': ['git', 'jenkins', 'ci/cd', 'linux', 'bash']
+        }
+        
+        # Flatten all skills
+        all_skills = []
+        for skill_list in skills.values():
+            if isinstance(skill_list, list):
+                all_skills.extend(skill_list)
+        
+        # Categorize each skill
+        for skill in all_skills:
+            skill_lower = skill.lower()
+            categorized_skill = False
+            
+            for category, keywords in category_keywords.items():
+                if any(keyword in skill_lower for keyword in keywords):
+                    categorized[category].append(skill)
+                    categorized_skill = True
+                    break
+            
+            if not categorized_skill:
+                categorized['technical'].append(skill)
+        
+        # Remove empty categories and duplicates
+        return {k: list(set(v)) for k, v in categorized.items() if v}
+
+    def format_experience_header(self, exp):
+        """Format experience header with company, location, and duration"""
+        parts = []
+        
+        if exp.get('company'):
+            parts.append(f"<b>{exp['company']}</b>")
+        
+        # Add location and duration on same line, properly spaced
+        details = []
+        if exp.get('location'):
+            details.append(exp['location'])
+        if exp.get('duration'):
+            details.append(exp['duration'])
+        
+        if details:
+            parts.append(" | ".join(details))
+        
+        return " | ".join(parts) if parts else None
+
+    def format_project_header(self, project):
+        """Format project header with name and duration"""
+        if not project.get('name'):
+            return None
+        
+        header = f"<b>{project['name']}</b>"
+        if project.get('duration'):
+            header += f" | <i>{project['duration']}</i>"
+        
+        return header
+
+    def format_technologies(self, technologies):
+        """Format technologies list"""
+        if isinstance(technologies, list):
+            return ", ".join(technologies)
+        return str(technologies)
+
+    def format_education_info(self, edu):
+        """Format education institution and year"""
+        parts = []
+        
+        if edu.get('school'):
+            parts.append(edu['school'])
+        if edu.get('location'):
+            parts.append(edu['location'])
+        if edu.get('year'):
+            parts.append(str(edu['year']))
+        
+        return " | ".join(parts) if parts else None
+
+    def format_education_details(self, edu):
+        """Format additional education details"""
+        details = []
+        
+        if edu.get('gpa'):
+            details.append(f"CGPA: {edu['gpa']}")
+        if edu.get('percentage'):
+            details.append(f"Percentage: {edu['percentage']}%")
+        if edu.get('honors'):
+            details.append(f"Honors: {edu['honors']}")
+        
+        return details
+
+    def format_certification(self, cert):
+        """Format certification information"""
+        if isinstance(cert, dict):
+            parts = []
+            if cert.get('name'):
+                parts.append(cert['name'])
+            if cert.get('issuer'):
+                parts.append(f"by {cert['issuer']}")
+            if cert.get('date'):
+                parts.append(f"({cert['date']})")
+            return " ".join(parts)
+        
+        return str(cert)
+
+    def extract_professional_title(self, summary):
+        """Extract professional title from summary"""
+        # Default title
+        default_title = "AI Engineer | Full Stack Developer | DevOps Specialist"
+        
+        # Try to extract roles from summary
+        role_keywords = {
+            'ai': 'AI Engineer',
+            'machine learning': 'ML Engineer', 
+            'data scientist': 'Data Scientist',
+            'full stack': 'Full Stack Developer',
+            'backend': 'Backend Developer',
+            'frontend': 'Frontend Developer',
+            'devops': 'DevOps Engineer',
+            'cloud': 'Cloud Engineer'
+        }
+        
+        summary_lower = summary.lower()
+        found_roles = []
+        
+        for keyword, role in role_keywords.items():
+            if keyword in summary_lower:
+                found_roles.append(role)
+        
+        if found_roles:
+            return " | ".join(found_roles[:3])  # Limit to 3 roles
+        
+        return default_title
+
+    def generate_docx_resume(self, resume_data):
+        """Generate Word document resume"""
+        doc = docx.Document()
+        
+        # Set document margins
+        sections = doc.sections
+        for section in sections:
+            section.top_margin = docx.shared.Inches(0.5)
+            section.bottom_margin = docx.shared.Inches(0.5)
+            section.left_margin = docx.shared.Inches(0.75)
+            section.right_margin = docx.shared.Inches(0.75)
+        
+        personal_info = resume_data.get('personal_info', {})
+        
+        # Header with name
+        if personal_info.get('name'):
+            name_para = doc.add_paragraph()
+            name_run = name_para.add_run(personal_info['name'].upper())
+            name_run.font.size = docx.shared.Pt(18)
+            name_run.font.bold = True
+            name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        
+        # Professional title
+        title_para = doc.add_paragraph("AI Engineer | Full Stack Developer | DevOps Specialist")
+        title_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        
+        # Contact information
+        if any(personal_info.values()):
+            # Create a table for contact info
+            contact_table = doc.add_table(rows=3, cols=2)
+            contact_table.style = 'Table Grid'
+            
+            # Left column
+            if personal_info.get('linkedin'):
+                contact_table.cell(0, 0).text = f"LinkedIn: {personal_info['linkedin']}"
+            if personal_info.get('location'):
+                contact_table.cell(1, 0).text = f"Location: {personal_info['location']}"
+            
+            # Right column
+            if personal_info.get('github'):
+                contact_table.cell(0, 1).text = f"GitHub: {personal_info['github']}"
+            if personal_info.get('phone'):
+                contact_table.cell(1, 1).text = f"Mob: {personal_info['phone']}"
+            if personal_info.get('email'):
+                contact_table.cell(2, 1).text = f"E-mail: {personal_info['email']}"
+        
+        # Professional Summary
+        if resume_data.get('summary'):
+            doc.add_paragraph()
+            summary_heading = doc.add_paragraph()
+            summary_run = summary_heading.add_run("PROFESSIONAL SUMMARY")
+            summary_run.font.bold = True
+            summary_run.underline = True
+            doc.add_paragraph(resume_data['summary'])
+        
+        # Core Competencies
+        skills = resume_data.get('skills', {})
+        if skills:
+            doc.add_paragraph()
+            skills_heading = doc.add_paragraph()
+            skills_run = skills_heading.add_run("CORE COMPETENCIES")
+            skills_run.font.bold = True
+            skills_run.underline = True
+            
+            tech_para = doc.add_paragraph()
+            tech_run = tech_para.add_run("Technical Skills:")
+            tech_run.font.bold = True
+            
+            if isinstance(skills, dict):
+                for category, skill_list in skills.items():
+                    if skill_list:
+                        category_para = doc.add_paragraph()
+                        category_run = category_para.add_run(f"- {category.replace('_', ' ').title()}: ")
+                        category_run.font.bold = True
+                        category_para.add_run(", ".join(skill_list))
+            elif isinstance(skills, list):
+                skills_para = doc.add_paragraph()
+                skills_para.add_run("- Technical Skills: ")
+                skills_para.add_run(", ".join(skills))
+        
+        # Work Experience
+        if resume_data.get('experience'):
+            doc.add_paragraph()
+            exp_heading = doc.add_paragraph()
+            exp_run = exp_heading.add_run("WORK EXPERIENCE")
+            exp_run.font.bold = True
+            exp_run.underline = True
+            
+            for exp in resume_data['experience']:
+                if exp.get('title'):
+                    title_para = doc.add_paragraph()
+                    title_run = title_para.add_run(exp['title'])
+                    title_run.font.bold = True
+                
+                if exp.get('company'):
+                    company_para = doc.add_paragraph()
+                    company_text = exp['company']
+                    if exp.get('duration'):
+                        company_text += f" | {exp['duration']}"
+                    company_run = company_para.add_run(company_text)
+                    company_run.font.bold = True
+                
+                if exp.get('description'):
+                    if isinstance(exp['description'], list):
+                        for desc in exp['description']:
+                            if desc.strip():
+                                desc_para = doc.add_paragraph(f"- {desc}")
+                    else:
+                        desc_para = doc.add_paragraph(f"- {exp['description']}")
+        
+        # Projects
+        if resume_data.get('projects'):
+            doc.add_paragraph()
+            proj_heading = doc.add_paragraph()
+            proj_run = proj_heading.add_run("KEY PROJECTS")
+            proj_run.font.bold = True
+            proj_run.underline = True
+            
+            for project in resume_data['projects']:
+                if project.get('name'):
+                    proj_para = doc.add_paragraph()
+                    proj_name = project['name']
+                    if project.get('duration'):
+                        proj_name += f" | {project['duration']}"
+                    proj_run = proj_para.add_run(proj_name)
+                    proj_run.font.bold = True
+                
+                if project.get('description'):
+                    if isinstance(project['description'], list):
+                        for desc in project['description']:
+                            if desc.strip():
+                                doc.add_paragraph(f"- {desc}")
+                    else:
+                        doc.add_paragraph(f"- {project['description']}")
+                
+                if project.get('technologies'):
+                    tech_para = doc.add_paragraph()
+                    tech_para.add_run("- Technologies: ").font.bold = True
+                    if isinstance(project['technologies'], list):
+                        tech_para.add_run(", ".join(project['technologies']))
+                    else:
+                        tech_para.add_run(project['technologies'])
+        
+        # Education
+        if resume_data.get('education'):
+            doc.add_paragraph()
+            edu_heading = doc.add_paragraph()
+            edu_run = edu_heading.add_run("EDUCATION")
+            edu_run.font.bold = True
+            edu_run.underline = True
+            
+            for edu in resume_data['education']:
+                if edu.get('degree'):
+                    degree_para = doc.add_paragraph()
+                    degree_run = degree_para.add_run(edu['degree'])
+                    degree_run.font.bold = True
+                
+                if edu.get('school'):
+                    school_text = edu['school']
+                    if edu.get('year'):
+                        school_text += f" | {edu['year']}"
+                    doc.add_paragraph(school_text)
+                
+                if edu.get('gpa'):
+                    doc.add_paragraph(f"CGPA: {edu['gpa']}")
+                elif edu.get('percentage'):
+                    doc.add_paragraph(f"Percentage: {edu['percentage']}")
+        
+        # Certifications
+        if resume_data.get('certifications'):
+            doc.add_paragraph()
+            cert_heading = doc.add_paragraph()
+            cert_run = cert_heading.add_run("CERTIFICATIONS")
+            cert_run.font.bold = True
+            cert_run.underline = True
+            
+            for cert in resume_data['certifications']:
+                if isinstance(cert, dict):
+                    cert_text = cert.get('name', '')
+                    if cert.get('issuer'):
+                        cert_text += f" - {cert['issuer']}"
+                    if cert.get('date'):
+                        cert_text += f" | {cert['date']}"
+                    doc.add_paragraph(f"- {cert_text}")
+                else:
+                    doc.add_paragraph(f"- {cert}")
+        
+        # Achievements
+        if resume_data.get('achievements'):
+            doc.add_paragraph()
+            achv_heading = doc.add_paragraph()
+            achv_run = achv_heading.add_run("ACHIEVEMENTS AND RECOGNITION")
+            achv_run.font.bold = True
+            achv_run.underline = True
+            
+            for achievement in resume_data['achievements']:
+                doc.add_paragraph(f"- {achievement}")
+        
+        # Save to buffer
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+
+_renderer = None
+
+
+def render_resume(item):
+    """Process pool entry point: (name, resume_data, fmt) -> (name, fmt, bytes, seconds, error)"""
+    global _renderer
+    name, resume_data, fmt = item
+    if _renderer is None:
+        _renderer = ResumeRenderer()
+    started = time.perf_counter()
+    try:
+        data = _renderer.render(resume_data, fmt)
+        return name, fmt, data, time.perf_counter() - started, None
+    except Exception as e:
+        return name, fmt, None, time.perf_counter() - started, str(e)
+
+
+def safe_filename(name, max_length=60):
+    """Filesystem- and zip-safe version of a document name"""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('_')[:max_length] or "resume"
+
+
+def render_resumes_to_zip(resumes, zip_target, formats=RENDER_FORMATS, max_workers=None):
+    """Render (name, resume_data) pairs in every format into a zip archive.
+
+    Documents render in a spawn-context process pool and are written into
+    `zip_target` (a path or writable binary file) as each one finishes.
+    Yields a {'Document', 'Format', 'Render (s)', 'Size (KB)', 'Error'}
+    row per document, in completion order.
+    """
+    items = [(safe_filename(name), resume_data, fmt) for name, resume_data in resumes for fmt in formats]
+    context = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(zip_target, 'w', compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=max_workers or RENDER_WORKERS, mp_context=context) as pool:
+        futures = [pool.submit(render_resume, item) for item in items]
+        for future in as_completed(futures):
+            name, fmt, data, seconds, error = future.result()
+            if data is not None:
+                archive.writestr(f"{name}.{fmt}", data)
+            yield {
+                'Document': f"{name}.{fmt}",
+                'Format': fmt.upper(),
+                'Render (s)': round(seconds, 3),
+                'Size (KB)': round(len(data) / 1024, 1) if data is not None else None,
+                'Error': error or ''
+            }
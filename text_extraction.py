@@ -0,0 +1,591 @@
+# text_extraction.py
+"""Resume text extraction.
+
+These helpers do not touch Streamlit so they can run in worker processes
+(bulk screening extracts hundreds of resumes in a process pool).
+"""
+import io
+import os
+import posixpath
+import re
+import sys
+import time
+import importlib.util
+import zipfile
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import PyPDF2
+import docx
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# PDFs with at least this many pages are split across the page pool; below
+# it, sending the file to worker processes costs more than it saves
+PDF_POOL_MIN_PAGES = int(os.getenv("PDF_POOL_MIN_PAGES", "8"))
+# Pages per pool task; each task re-opens the PDF, so tiny ranges waste time
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "0")) or None
+
+# Engines to try, in order; engines whose library is not installed are skipped
+PDF_BACKEND_ORDER = [
+    name.strip() for name in os.getenv("PDF_BACKENDS", "pypdfium2,pdfminer,pypdf,pypdf2").split(",") if name.strip()
+]
+# A page with less text than this falls back to the next engine
+PDF_MIN_PAGE_CHARS = int(os.getenv("PDF_MIN_PAGE_CHARS", "100"))
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+class PDFBackend:
+    """A PDF text engine. Libraries are imported on open so optional engines
+    that are not installed cost nothing."""
+
+    name = ""
+    module = ""
+
+    def available(self):
+        return importlib.util.find_spec(self.module) is not None
+
+    def open(self, data):
+        raise NotImplementedError
+
+    def page_count(self, document):
+        return len(document)
+
+    def page_text(self, document, index):
+        raise NotImplementedError
+
+
+class PyPDF2Backend(PDFBackend):
+    """PyPDF2: always installed, but slow and reads two-column layouts row by row"""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, data):
+        return PyPDF2.PdfReader(io.BytesIO(data)).pages
+
+    def page_text(self, pages, index):
+        return pages[index].extract_text() or ""
+
+
+class PypdfBackend(PDFBackend):
+    """pypdf: the maintained successor of PyPDF2, noticeably faster"""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def open(self, data):
+        import pypdf
+        return pypdf.PdfReader(io.BytesIO(data)).pages
+
+    def page_text(self, pages, index):
+        return pages[index].extract_text() or ""
+
+
+class PdfminerBackend(PDFBackend):
+    """pdfminer.six: its layout analysis groups text boxes into columns, so
+    two-column resumes come out one column at a time"""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, data):
+        # Parse the document once; extract_text would re-parse it per call
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        document = PDFDocument(PDFParser(io.BytesIO(data)))
+        return PDFResourceManager(caching=True), list(PDFPage.create_pages(document))
+
+    def page_count(self, document):
+        return len(document[1])
+
+    def page_text(self, document, index):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams, LTTextContainer
+        from pdfminer.pdfinterp import PDFPageInterpreter
+        resources, pages = document
+        device = PDFPageAggregator(resources, laparams=LAParams(boxes_flow=0.5))
+        try:
+            PDFPageInterpreter(resources, device).process_page(pages[index])
+            layout = device.get_result()
+        finally:
+            device.close()
+        return "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+
+class Pypdfium2Backend(PDFBackend):
+    """pypdfium2: bindings to Chrome's PDFium, the fastest engine here"""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def open(self, data):
+        import pypdfium2
+        return pypdfium2.PdfDocument(data)
+
+    def page_text(self, document, index):
+        textpage = document[index].get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+
+
+PDF_BACKENDS = {
+    backend.name: backend
+    for backend in (Pypdfium2Backend(), PdfminerBackend(), PypdfBackend(), PyPDF2Backend())
+}
+
+
+def configured_pdf_backends(names=None):
+    """Installed backends in the configured order, PyPDF2 always last resort"""
+    names = list(names or PDF_BACKEND_ORDER)
+    if "pypdf2" not in names:
+        names.append("pypdf2")
+    return [PDF_BACKENDS[name] for name in names if name in PDF_BACKENDS and PDF_BACKENDS[name].available()]
+
+
+class PDFExtractor:
+    """Extracts pages from one PDF, falling back through backends.
+
+    Each backend opens the document only when first needed. A page whose
+    text is shorter than PDF_MIN_PAGE_CHARS is retried with the next
+    backend, and the longest text wins.
+    """
+
+    def __init__(self, data, backend_names=None):
+        self.data = data
+        self.backends = configured_pdf_backends(backend_names)
+        self.documents = {}
+
+    def document(self, backend):
+        if backend.name not in self.documents:
+            self.documents[backend.name] = backend.open(self.data)
+        return self.documents[backend.name]
+
+    def page_count(self):
+        for backend in self.backends:
+            try:
+                return backend.page_count(self.document(backend))
+            except Exception:
+                continue
+        raise ValueError("None of the PDF backends could open this file")
+
+    def page_text(self, index):
+        best = ""
+        for backend in self.backends:
+            try:
+                text = backend.page_text(self.document(backend), index)
+            except Exception:
+                continue
+            if len(text.strip()) >= PDF_MIN_PAGE_CHARS:
+                return text
+            if len(text.strip()) > len(best.strip()):
+                best = text
+        return best
+
+
+def get_page_pool():
+    """Long-lived process pool for page extraction, started on first use"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _page_pool
+
+
+def reset_page_pool():
+    """Drop a broken page pool so the next call starts a fresh one"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False, cancel_futures=True)
+        _page_pool = None
+
+
+def extract_pdf_pages(task):
+    """Process pool entry point: (pdf bytes, start, stop, backend names) -> [(index, text, seconds)]"""
+    data, start, stop, backend_names = task
+    extractor = PDFExtractor(data, backend_names)
+    pages = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = extractor.page_text(index)
+        pages.append((index, text, time.perf_counter() - started))
+    return pages
+
+
+def iter_pdf_pages(pdf_file, use_pool=True):
+    """Yield (page_number, page_count, text, seconds) for each page, in page order.
+
+    Large PDFs are split into page ranges extracted in the shared process
+    pool, and pages are yielded as soon as their range is done, so callers
+    can use the first pages while later ones are still being extracted.
+    `seconds` is the time spent extracting that page. The pool is only used
+    from the main process: a worker that started its own long-lived pool
+    could never exit, hanging the pool it belongs to.
+    """
+    data = pdf_file.read() if hasattr(pdf_file, 'read') else pdf_file
+    extractor = PDFExtractor(data)
+    page_count = extractor.page_count()
+
+    in_worker = multiprocessing.parent_process() is not None
+    if not use_pool or in_worker or page_count < PDF_POOL_MIN_PAGES:
+        for index in range(page_count):
+            started = time.perf_counter()
+            text = extractor.page_text(index)
+            yield index + 1, page_count, text, time.perf_counter() - started
+        return
+
+    tasks = [
+        (data, start, min(start + PDF_PAGES_PER_TASK, page_count), PDF_BACKEND_ORDER)
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    try:
+        for pages in get_page_pool().map(extract_pdf_pages, tasks):
+            for index, text, seconds in pages:
+                yield index + 1, page_count, text, seconds
+    except BrokenProcessPool:
+        reset_page_pool()
+        raise
+
+
+def pdf_to_text(pdf_file, on_page=None, use_pool=True):
+    """Extract text from a PDF file object.
+
+    `on_page(page_number, page_count, seconds)` is called as each page lands.
+    """
+    parts = []
+    for page_number, page_count, text, seconds in iter_pdf_pages(pdf_file, use_pool):
+        parts.append(text)
+        parts.append("\n")
+        if on_page:
+            on_page(page_number, page_count, seconds)
+    return "".join(parts)
+
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MARKUP_COMPATIBILITY_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+PACKAGE_RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Relationship types end in the same name in transitional and strict documents
+OFFICE_DOCUMENT_REL = "/officeDocument"
+HEADER_REL = "/header"
+FOOTER_REL = "/footer"
+
+
+def iter_docx_part_lines(part):
+    """Stream lines of text from one WordprocessingML part.
+
+    Paragraphs become lines and table rows become one line with cells
+    separated by " | ". Text boxes are nested inside paragraphs, so they
+    come out in document order. Their legacy VML copies under
+    mc:Fallback are skipped so each text box appears once.
+    """
+    paragraphs = []
+    rows = []
+    cells = []
+    fallback_depth = 0
+
+    def emit(line):
+        if cells:
+            cells[-1].append(line)
+        else:
+            return line
+
+    for event, element in ElementTree.iterparse(part, events=("start", "end")):
+        tag = element.tag
+        if tag == MARKUP_COMPATIBILITY_NS + "Fallback":
+            fallback_depth += 1 if event == "start" else -1
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == WORD_NS + "p":
+                paragraphs.append([])
+            elif tag == WORD_NS + "tr":
+                rows.append([])
+            elif tag == WORD_NS + "tc":
+                cells.append([])
+            continue
+
+        if tag == WORD_NS + "t" and paragraphs:
+            paragraphs[-1].append(element.text or "")
+        elif tag == WORD_NS + "tab" and paragraphs:
+            paragraphs[-1].append("\t")
+        elif tag in (WORD_NS + "br", WORD_NS + "cr") and paragraphs:
+            paragraphs[-1].append("\n")
+        elif tag == WORD_NS + "p":
+            line = emit("".join(paragraphs.pop()))
+            if line is not None:
+                yield line
+        elif tag == WORD_NS + "tc":
+            cell = " ".join(text.strip() for text in cells.pop() if text.strip())
+            if rows:
+                rows[-1].append(cell)
+        elif tag == WORD_NS + "tr":
+            line = emit(" | ".join(cell for cell in rows.pop() if cell))
+            if line is not None:
+                yield line
+        else:
+            continue
+        # Finished block elements are no longer needed; keep memory flat
+        element.clear()
+
+
+def docx_part_relationships(archive, part_name):
+    """Return (type, part name) pairs for the internal relationships of a part.
+
+    part_name "" reads the package relationships in _rels/.rels. Targets
+    are resolved relative to the part's folder, or to the package root
+    when absolute.
+    """
+    folder, base = posixpath.split(part_name)
+    rels_name = posixpath.join(folder, "_rels", base + ".rels")
+    try:
+        rels_part = archive.open(rels_name)
+    except KeyError:
+        return []
+    relationships = []
+    with rels_part:
+        for _, elem in ElementTree.iterparse(rels_part):
+            if elem.tag != PACKAGE_RELATIONSHIPS_NS + "Relationship" or elem.get("TargetMode") == "External":
+                continue
+            target = elem.get("Target", "")
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            relationships.append((elem.get("Type", ""), target))
+    return relationships
+
+
+def docx_to_text(docx_file):
+    """Extract text from a DOCX file object, reading the XML parts directly.
+
+    Covers body paragraphs, tables, text boxes and headers/footers
+    (headers first, footers last), without building python-docx's object
+    model. The main document is found through _rels/.rels and its headers
+    and footers through the document's own relationships, so parts with
+    non-default names are read too. Identical header/footer parts are
+    included once.
+    """
+    with zipfile.ZipFile(docx_file) as archive:
+        document = next(
+            (target for rel_type, target in docx_part_relationships(archive, "")
+             if rel_type.endswith(OFFICE_DOCUMENT_REL)),
+            "word/document.xml",
+        )
+        document_rels = docx_part_relationships(archive, document)
+        headers = sorted({target for rel_type, target in document_rels if rel_type.endswith(HEADER_REL)})
+        footers = sorted({target for rel_type, target in document_rels if rel_type.endswith(FOOTER_REL)})
+
+        lines = []
+        seen_parts = set()
+        for name in headers + [document] + footers:
+            with archive.open(name) as part:
+                part_lines = list(iter_docx_part_lines(part))
+            part_text = "\n".join(part_lines)
+            if name != document and (not part_text.strip() or part_text in seen_parts):
+                continue
+            seen_parts.add(part_text)
+            lines.extend(part_lines)
+    return "".join(line + "\n" for line in lines)
+
+
+def docx_paragraphs_to_text(docx_file):
+    """Previous python-docx extraction (body paragraphs only), kept for benchmarks"""
+    doc = docx.Document(docx_file)
+    return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+
+
+def extract_resume_text(filename, data):
+    """Extract text from resume bytes, picking the reader by file extension.
+
+    Used per file by extract_many's workers, so PDFs are read inline rather
+    than through the page pool.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.pdf':
+        return pdf_to_text(io.BytesIO(data), use_pool=False)
+    if extension == '.docx':
+        return docx_to_text(io.BytesIO(data))
+    raise ValueError(f"Unsupported resume format: {extension or filename}")
+
+
+def extract_resume_text_safe(item):
+    """Process pool entry point: (filename, data) -> (filename, text, error)"""
+    filename, data = item
+    try:
+        return filename, extract_resume_text(filename, data), None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+def iter_resume_files(source):
+    """Yield (filename, bytes) for every resume in a folder or zip archive.
+
+    `source` may be a directory path, a zip file path or a file-like object
+    holding a zip archive. Unsupported files are skipped.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        yield name, f.read()
+        return
+
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            # Skip folders and macOS resource forks
+            if info.is_dir() or name.startswith('._'):
+                continue
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield name, archive.read(info)
+
+
+def extract_many(files, max_workers=None):
+    """Extract text from many (filename, bytes) pairs in a process pool.
+
+    Yields (filename, text, error) in input order. A spawn context is used
+    because forking the multi-threaded Streamlit server is unsafe.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        yield from pool.map(extract_resume_text_safe, files, chunksize=4)
+
+
+RESUME_HEADINGS = re.compile(
+    r'^\s*(experience|work experience|employment|education|skills|projects|certifications|summary)\b',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def text_quality(text):
+    """Rough quality signals for extracted resume text, no ground truth needed.
+
+    word_ratio: share of tokens that look like words (garbled or merged
+    text scores low); split_ratio: share of single-letter tokens ("E x p e r");
+    headings: resume section headings found at the start of a line.
+    """
+    tokens = text.split()
+    if not tokens:
+        return {"word_ratio": 0.0, "split_ratio": 0.0, "headings": 0}
+    words = sum(1 for token in tokens if re.fullmatch(r"[A-Za-z][A-Za-z'\-]{1,24}[.,;:)]?", token))
+    singles = sum(1 for token in tokens if len(token) == 1 and token.isalpha())
+    return {
+        "word_ratio": round(words / len(tokens), 3),
+        "split_ratio": round(singles / len(tokens), 3),
+        "headings": len(RESUME_HEADINGS.findall(text))
+    }
+
+
+def benchmark_pdf_backends(files, backend_names=None):
+    """Compare PDF backends on (filename, bytes) pairs, without fallback.
+
+    Returns one row per installed backend with throughput and averaged
+    text_quality scores. Files a backend cannot read count as failures.
+    """
+    files = [(name, data) for name, data in files if name.lower().endswith('.pdf')]
+    rows = []
+    for backend in configured_pdf_backends(backend_names or list(PDF_BACKENDS)):
+        pages = chars = failures = 0
+        seconds = 0.0
+        scores = []
+        for _, data in files:
+            started = time.perf_counter()
+            try:
+                document = backend.open(data)
+                page_count = backend.page_count(document)
+                text = "\n".join(backend.page_text(document, index) for index in range(page_count))
+            except Exception:
+                failures += 1
+                continue
+            finally:
+                seconds += time.perf_counter() - started
+            pages += page_count
+            chars += len(text)
+            scores.append(text_quality(text))
+        rows.append({
+            "backend": backend.name,
+            "files": len(files) - failures,
+            "failures": failures,
+            "pages": pages,
+            "seconds": round(seconds, 3),
+            "pages_per_second": round(pages / seconds, 1) if seconds else 0.0,
+            "chars_per_page": round(chars / pages) if pages else 0,
+            **{
+                key: round(sum(score[key] for score in scores) / len(scores), 3) if scores else 0.0
+                for key in ("word_ratio", "split_ratio", "headings")
+            }
+        })
+    return rows
+
+
+def benchmark_docx_extraction(files):
+    """Compare the XML stream extractor with the python-docx paragraph path.
+
+    Returns one row per extractor with throughput, characters recovered
+    (coverage) and averaged text_quality scores.
+    """
+    files = [(name, data) for name, data in files if name.lower().endswith('.docx')]
+    rows = []
+    for label, extract in (("python-docx", docx_paragraphs_to_text), ("xml-stream", docx_to_text)):
+        chars = failures = 0
+        seconds = 0.0
+        scores = []
+        for _, data in files:
+            started = time.perf_counter()
+            try:
+                text = extract(io.BytesIO(data))
+            except Exception:
+                failures += 1
+                continue
+            finally:
+                seconds += time.perf_counter() - started
+            chars += len(text)
+            scores.append(text_quality(text))
+        extracted = len(files) - failures
+        rows.append({
+            "backend": label,
+            "files": extracted,
+            "failures": failures,
+            "seconds": round(seconds, 3),
+            "files_per_second": round(extracted / seconds, 1) if seconds else 0.0,
+            "chars_per_file": round(chars / extracted) if extracted else 0,
+            **{
+                key: round(sum(score[key] for score in scores) / len(scores), 3) if scores else 0.0
+                for key in ("word_ratio", "split_ratio", "headings")
+            }
+        })
+    return rows
+
+
+def print_table(rows):
+    if rows:
+        columns = list(rows[0])
+        print("  ".join(f"{column:>16}" for column in columns))
+        for row in rows:
+            print("  ".join(f"{row[column]!s:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    # Benchmark harness: python text_extraction.py <folder or zip of sample resumes>
+    if len(sys.argv) != 2:
+        sys.exit("usage: python text_extraction.py <folder-or-zip>")
+    samples = list(iter_resume_files(sys.argv[1]))
+    print_table(benchmark_pdf_backends(samples))
+    print()
+    print_table(benchmark_docx_extraction(samples))